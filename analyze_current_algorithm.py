@@ -5,6 +5,7 @@
 
 import sys
 import os
+from collections import Counter
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from core.optimized_layout import OptimizedLayoutGenerator
@@ -49,8 +50,8 @@ def analyze_current_algorithm():
     # 分析规则布局的问题
     if regular_layout:
         print("   布局分析:")
-        horizontal_count = sum(1 for t in regular_layout if t.rotation == 0)
-        vertical_count = sum(1 for t in regular_layout if t.rotation == 90)
+        rotations = Counter(t.rotation for t in regular_layout)
+        horizontal_count, vertical_count = rotations[0], rotations[90]
         print(f"     横向: {horizontal_count} 个")
         print(f"     纵向: {vertical_count} 个")
         
@@ -82,8 +83,8 @@ def analyze_current_algorithm():
     # 分析优化布局的问题
     if opt_layout:
         print("   布局分析:")
-        horizontal_count = sum(1 for t in opt_layout if t.rotation == 0)
-        vertical_count = sum(1 for t in opt_layout if t.rotation == 90)
+        rotations = Counter(t.rotation for t in opt_layout)
+        horizontal_count, vertical_count = rotations[0], rotations[90]
         print(f"     横向: {horizontal_count} 个")
         print(f"     纵向: {vertical_count} 个")
         
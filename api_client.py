@@ -0,0 +1,53 @@
+"""
+API测试脚本共用的HTTP会话和JSON编解码工具
+"""
+
+import json
+import threading
+
+import requests
+
+# orjson 为可选依赖，未安装时使用标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+def dumps(data) -> bytes:
+    """把请求数据编码为JSON字节串"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+
+def loads(content: bytes):
+    """解析JSON响应内容（传入 response.content）"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+# 每个线程复用自己的会话保持连接（requests.Session 不能在线程间共享）
+_local = threading.local()
+
+
+def get_session() -> requests.Session:
+    """返回当前线程的会话，首次调用时创建"""
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def post_json(url: str, payload, **kwargs):
+    """
+    以JSON发送POST请求并返回解析后的响应数据
+
+    HTTP状态码表示错误时抛出 requests.HTTPError，可从异常的 response 取得状态码
+    """
+    response = get_session().post(url, data=dumps(payload), headers=JSON_HEADERS, **kwargs)
+    response.raise_for_status()
+    return loads(response.content)
@@ -8,6 +8,7 @@ import sys
 from typing import Dict, List, Tuple
 import traceback
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # 添加项目路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -50,6 +51,9 @@ else:
 app = Flask(__name__, static_folder='static', static_url_path='')
 CORS(app)  # 启用跨域支持
 
+# 批量优化接口同时计算的最大请求数
+BATCH_WORKERS = 4
+
 # 配置
 app.config['MAX_CONTENT_LENGTH'] = APP_CONFIG.get('api', {}).get('max_upload_size', 16 * 1024 * 1024)
 
@@ -74,42 +78,20 @@ def health_check():
     })
 
 
-@app.route('/api/layout/optimize', methods=['POST'])
-def optimize_layout():
+def _optimize_case(data: Dict) -> Tuple[Dict, int]:
     """
-    优化台球桌布局
+    执行单个布局优化请求
     
-    请求体:
-    {
-        "boundary": [[x1, y1], [x2, y2], ...],  # 场地边界点
-        "obstacles": [  # 障碍物列表
-            {
-                "type": "rectangle",
-                "center": [x, y],
-                "size": [width, height]
-            },
-            ...
-        ],
-        "config": {  # 配置参数
-            "wall_distance": 1500,
-            "table_distance": 1400,
-            "table_width": 2850,
-            "table_height": 1550,
-            "grid_size": 100,
-            "use_regular_layout": true,
-            "use_enhanced_algorithm": true  # 新增：是否使用增强算法
-        }
-    }
+    Returns:
+        (响应数据, HTTP状态码)
     """
     try:
-        data = request.get_json()
-        
         # 验证输入
         if not data or 'boundary' not in data:
-            return jsonify({
+            return {
                 'success': False,
                 'error': '缺少boundary参数'
-            }), 400
+            }, 400
         
         boundary = data['boundary']
         obstacles_data = data.get('obstacles', [])
@@ -223,22 +205,88 @@ def optimize_layout():
                 'algorithm_used': algorithm_used
             }
         
-        return jsonify({
+        return {
             'success': True,
             'tables': tables_data,
             'count': len(tables),
             'stats': stats_data,
             'optimization_time': 0.0,  # 简化处理
             'algorithm': algorithm_used
-        })
+        }, 200
         
     except Exception as e:
         print(f"Error in optimize_layout: {str(e)}")
         print(traceback.format_exc())
-        return jsonify({
+        return {
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500
+
+
+@app.route('/api/layout/optimize', methods=['POST'])
+def optimize_layout():
+    """
+    优化台球桌布局
+    
+    请求体:
+    {
+        "boundary": [[x1, y1], [x2, y2], ...],  # 场地边界点
+        "obstacles": [  # 障碍物列表
+            {
+                "type": "rectangle",
+                "center": [x, y],
+                "size": [width, height]
+            },
+            ...
+        ],
+        "config": {  # 配置参数
+            "wall_distance": 1500,
+            "table_distance": 1400,
+            "table_width": 2850,
+            "table_height": 1550,
+            "grid_size": 100,
+            "use_regular_layout": true,
+            "use_enhanced_algorithm": true  # 新增：是否使用增强算法
+        }
+    }
+    """
+    result, status = _optimize_case(request.get_json(silent=True))
+    return jsonify(result), status
+
+
+@app.route('/api/layout/optimize/batch', methods=['POST'])
+def optimize_layout_batch():
+    """
+    批量优化台球桌布局
+    
+    请求体:
+    {
+        "cases": [...]  # 每项与 /api/layout/optimize 的请求体相同
+    }
+    
+    各请求互不依赖，并行计算；results 按 cases 的顺序返回，
+    每项与 /api/layout/optimize 的响应相同。部分用例失败时仍返回200，
+    failed 为失败的用例数，只有全部用例成功时 success 才为 true
+    """
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data.get('cases'), list):
+        return jsonify({
+            'success': False,
+            'error': '缺少cases参数'
+        }), 400
+    
+    cases = data['cases']
+    results = []
+    if cases:
+        with ThreadPoolExecutor(max_workers=min(len(cases), BATCH_WORKERS)) as executor:
+            results = [result for result, _ in executor.map(_optimize_case, cases)]
+    
+    failed = sum(1 for result in results if not result['success'])
+    return jsonify({
+        'success': failed == 0,
+        'failed': failed,
+        'results': results
+    })
 
 
 @app.route('/api/layout/validate', methods=['POST'])
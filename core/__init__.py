@@ -5,7 +5,8 @@
 from .maxrects import Rectangle, BilliardTable, MaxRectsAlgorithm
 from .constraints import (
     Constraint, DistanceConstraint, AccessibilityConstraint,
-    ConstraintSolver, ConstraintViolation, SpatialIndex
+    ConstraintSolver, ConstraintViolation, SpatialIndex, UniformGridIndex,
+    PlacementKernel
 )
 from .optimizer import LayoutOptimizer
 from .geometry import GeometryProcessor, parse_image_boundary
@@ -28,6 +29,8 @@ __all__ = [
     'ConstraintSolver',
     'ConstraintViolation',
     'SpatialIndex',
+    'UniformGridIndex',
+    'PlacementKernel',
     
     # 优化器
     'LayoutOptimizer',
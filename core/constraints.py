@@ -4,15 +4,22 @@
 """
 
 from typing import List, Tuple, Dict, Optional
+from functools import lru_cache
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 import numpy as np
 from rtree import index
-from shapely.geometry import Polygon, Point, LineString
+from shapely.geometry import Polygon, Point, LineString, box
 from shapely.ops import unary_union
 
 from .maxrects import Rectangle, BilliardTable
 
+# numba 为可选依赖，未安装时使用NumPy实现
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 
 @dataclass
 class ConstraintViolation:
@@ -35,6 +42,15 @@ class Constraint(ABC):
     def get_name(self) -> str:
         """获取约束名称"""
         pass
+    
+    def check_addition(self, table: BilliardTable, layout: List[BilliardTable], 
+                       context: Dict) -> Tuple[bool, Optional[ConstraintViolation]]:
+        """
+        检查向已满足约束的布局中添加一张台球桌后约束是否仍满足
+        
+        默认实现检查完整布局，子类可以只检查新增台球桌
+        """
+        return self.check(layout + [table], context)
 
 
 class DistanceConstraint(Constraint):
@@ -44,97 +60,192 @@ class DistanceConstraint(Constraint):
         self.wall_distance = wall_distance
         self.table_distance = table_distance
         self.obstacle_distance = obstacle_distance
+        # 最近使用的 (场地多边形, 边界线)，同一多边形的边界线只构造一次
+        self._ring_cache = None
     
     def get_name(self) -> str:
         return "距离约束"
     
     def check(self, layout: List[BilliardTable], context: Dict) -> Tuple[bool, Optional[ConstraintViolation]]:
         """检查所有距离约束"""
-        # 检查台球桌之间的距离
+        # 检查台球桌之间的距离（比较距离平方，违反时才开方）
+        min_sq = self.table_distance ** 2
         for i, table1 in enumerate(layout):
             bounds1 = table1.get_bounds()
             for j, table2 in enumerate(layout[i+1:], i+1):
                 bounds2 = table2.get_bounds()
-                distance = bounds1.distance_to(bounds2)
-                if distance < self.table_distance:
-                    return False, ConstraintViolation(
-                        constraint_type="table_distance",
-                        description=f"台球桌{i}和{j}之间距离{distance:.0f}mm小于要求的{self.table_distance}mm",
-                        severity="error",
-                        objects=[table1, table2]
-                    )
+                if bounds1.distance_to_squared(bounds2) < min_sq:
+                    distance = bounds1.distance_to(bounds2)
+                    return False, self._table_violation(i, j, table1, table2, distance)
         
         # 检查与墙壁的距离
+        violation = self._check_wall_distance(layout, context)
+        if violation:
+            return False, violation
+        
+        # 检查与障碍物的距离
+        violation = self._check_obstacle_distance(layout, context)
+        if violation:
+            return False, violation
+        
+        return True, None
+    
+    def check_addition(self, table: BilliardTable, layout: List[BilliardTable], 
+                       context: Dict) -> Tuple[bool, Optional[ConstraintViolation]]:
+        """只检查新增台球桌与已有台球桌、墙壁和障碍物的距离"""
+        index = len(layout)
+        bounds = table.get_bounds()
+        
+        # 有网格索引时只检查邻近的台球桌
+        table_index = context.get('table_index')
+        if table_index is not None:
+            neighbors = table_index.query(bounds, self.table_distance)
+        else:
+            neighbors = [(i, placed, placed.get_bounds()) for i, placed in enumerate(layout)]
+        
+        min_sq = self.table_distance ** 2
+        for i, placed, placed_bounds in neighbors:
+            if placed_bounds.distance_to_squared(bounds) < min_sq:
+                distance = placed_bounds.distance_to(bounds)
+                return False, self._table_violation(i, index, placed, table, distance)
+        
+        violation = self._check_wall_distance([table], context, start=index)
+        if violation:
+            return False, violation
+        
+        violation = self._check_obstacle_distance([table], context, start=index)
+        if violation:
+            return False, violation
+        
+        return True, None
+    
+    def _table_violation(self, i: int, j: int, table1: BilliardTable, table2: BilliardTable, 
+                         distance: float) -> ConstraintViolation:
+        """台球桌间距违反信息"""
+        return ConstraintViolation(
+            constraint_type="table_distance",
+            description=f"台球桌{i}和{j}之间距离{distance:.0f}mm小于要求的{self.table_distance}mm",
+            severity="error",
+            objects=[table1, table2]
+        )
+    
+    def _check_wall_distance(self, tables: List[BilliardTable], context: Dict, 
+                             start: int = 0) -> Optional[ConstraintViolation]:
+        """检查台球桌与墙壁的距离，start为第一张台球桌在布局中的编号"""
+        # 轴对齐矩形场地：直接比较坐标，无需构造多边形
+        # 上下文未提供时根据边界判断（结果按边界缓存，不修改调用方的上下文）
+        if 'boundary_rect' in context:
+            boundary_rect = context['boundary_rect']
+        elif 'boundary' in context:
+            boundary_rect = field_rect(context['boundary'])
+        else:
+            boundary_rect = None
+        if boundary_rect:
+            return self._check_rect_wall_distance(tables, boundary_rect, start)
+        
         # 如果没有boundary_polygon，尝试创建
         boundary_polygon = context.get('boundary_polygon')
         if not boundary_polygon and 'boundary' in context:
             try:
-                boundary_polygon = Polygon(context['boundary'])
-                context['boundary_polygon'] = boundary_polygon
+                boundary_polygon = field_polygon(context['boundary'])
             except:
                 pass
                 
         if boundary_polygon:
-            for i, table in enumerate(layout):
+            boundary_ring = self._boundary_ring(boundary_polygon)
+            
+            for i, table in enumerate(tables, start):
                 bounds = table.get_bounds()
                 # 创建台球桌的多边形
                 table_poly = Polygon([
                     (bounds.x, bounds.y),
-                    (bounds.x + bounds.width, bounds.y),
-                    (bounds.x + bounds.width, bounds.y + bounds.height),
-                    (bounds.x, bounds.y + bounds.height)
+                    (bounds.x2, bounds.y),
+                    (bounds.x2, bounds.y2),
+                    (bounds.x, bounds.y2)
                 ])
                 
                 # 计算到边界的距离
-                distance = boundary_polygon.boundary.distance(table_poly)
+                distance = boundary_ring.distance(table_poly)
                 if distance < self.wall_distance:
-                    return False, ConstraintViolation(
+                    return ConstraintViolation(
                         constraint_type="wall_distance",
                         description=f"台球桌{i}距离墙壁{distance:.0f}mm小于要求的{self.wall_distance}mm",
                         severity="error",
                         objects=[table]
                     )
-        else:
+        elif 'boundary' in context:
             # 使用简单的矩形边界检查
-            if 'boundary' in context:
-                boundary = context['boundary']
-                min_x = min(p[0] for p in boundary)
-                max_x = max(p[0] for p in boundary)
-                min_y = min(p[1] for p in boundary)
-                max_y = max(p[1] for p in boundary)
-                
-                for i, table in enumerate(layout):
-                    bounds = table.get_bounds()
-                    # 检查到各边的距离
-                    dist_left = bounds.x - min_x
-                    dist_right = max_x - (bounds.x + bounds.width)
-                    dist_top = bounds.y - min_y
-                    dist_bottom = max_y - (bounds.y + bounds.height)
-                    
-                    min_dist = min(dist_left, dist_right, dist_top, dist_bottom)
-                    if min_dist < self.wall_distance:
-                        return False, ConstraintViolation(
-                            constraint_type="wall_distance",
-                            description=f"台球桌{i}距离墙壁{min_dist:.0f}mm小于要求的{self.wall_distance}mm",
-                            severity="error",
-                            objects=[table]
-                        )
+            boundary = context['boundary']
+            return self._check_rect_wall_distance(tables, (
+                min(p[0] for p in boundary),
+                min(p[1] for p in boundary),
+                max(p[0] for p in boundary),
+                max(p[1] for p in boundary)
+            ), start)
         
-        # 检查与障碍物的距离
+        return None
+    
+    def _boundary_ring(self, polygon: Polygon):
+        """场地多边形的边界线，同一多边形只构造一次"""
+        cached = self._ring_cache
+        if cached is None or cached[0] is not polygon:
+            cached = (polygon, polygon.boundary)
+            self._ring_cache = cached
+        return cached[1]
+    
+    def _check_rect_wall_distance(self, tables: List[BilliardTable], 
+                                  rect: Tuple[float, float, float, float], 
+                                  start: int = 0) -> Optional[ConstraintViolation]:
+        """检查台球桌到矩形场地四边的距离"""
+        min_x, min_y, max_x, max_y = rect
+        for i, table in enumerate(tables, start):
+            bounds = table.get_bounds()
+            # 检查到各边的距离
+            dist_left = bounds.x - min_x
+            dist_right = max_x - bounds.x2
+            dist_top = bounds.y - min_y
+            dist_bottom = max_y - bounds.y2
+            
+            min_dist = min(dist_left, dist_right, dist_top, dist_bottom)
+            if min_dist < self.wall_distance:
+                return ConstraintViolation(
+                    constraint_type="wall_distance",
+                    description=f"台球桌{i}距离墙壁{min_dist:.0f}mm小于要求的{self.wall_distance}mm",
+                    severity="error",
+                    objects=[table]
+                )
+        return None
+    
+    def _check_obstacle_distance(self, tables: List[BilliardTable], context: Dict, 
+                                 start: int = 0) -> Optional[ConstraintViolation]:
+        """检查台球桌与障碍物的距离"""
         obstacles = context.get('obstacles', [])
-        for i, table in enumerate(layout):
+        # 障碍物较多时上下文中会提供STRtree，只检查包络落在安全范围内的障碍物
+        obstacle_tree = context.get('obstacle_tree')
+        margin = self.obstacle_distance
+        min_sq = self.obstacle_distance ** 2
+        
+        for i, table in enumerate(tables, start):
             bounds = table.get_bounds()
-            for j, obstacle in enumerate(obstacles):
-                distance = bounds.distance_to(obstacle)
-                if distance < self.obstacle_distance:
-                    return False, ConstraintViolation(
+            if obstacle_tree is not None:
+                nearby = sorted(obstacle_tree.query(box(
+                    bounds.x - margin, bounds.y - margin,
+                    bounds.x2 + margin, bounds.y2 + margin
+                )).tolist())
+            else:
+                nearby = range(len(obstacles))
+            
+            for j in nearby:
+                obstacle = obstacles[j]
+                if bounds.distance_to_squared(obstacle) < min_sq:
+                    distance = bounds.distance_to(obstacle)
+                    return ConstraintViolation(
                         constraint_type="obstacle_distance",
                         description=f"台球桌{i}距离障碍物{j}太近：{distance:.0f}mm",
                         severity="error",
                         objects=[table, obstacle]
                     )
-        
-        return True, None
+        return None
 
 
 class AccessibilityConstraint(Constraint):
@@ -170,8 +281,8 @@ class SpatialIndex:
         # R-tree使用(minx, miny, maxx, maxy)格式
         self.idx.insert(obj_id, (
             bounds.x, bounds.y,
-            bounds.x + bounds.width,
-            bounds.y + bounds.height
+            bounds.x2,
+            bounds.y2
         ))
         self.objects[obj_id] = (obj, bounds)
         return obj_id
@@ -181,8 +292,8 @@ class SpatialIndex:
         results = []
         for obj_id in self.idx.intersection((
             bounds.x, bounds.y,
-            bounds.x + bounds.width,
-            bounds.y + bounds.height
+            bounds.x2,
+            bounds.y2
         )):
             obj, obj_bounds = self.objects[obj_id]
             results.append((obj_id, obj, obj_bounds))
@@ -205,8 +316,8 @@ class SpatialIndex:
             return 0.0
         
         # 计算到矩形边界的最短距离
-        dx = max(rect.x - x, 0, x - (rect.x + rect.width))
-        dy = max(rect.y - y, 0, y - (rect.y + rect.height))
+        dx = max(rect.x - x, 0, x - rect.x2)
+        dy = max(rect.y - y, 0, y - rect.y2)
         return np.sqrt(dx**2 + dy**2)
     
     def remove(self, obj_id: int):
@@ -215,8 +326,8 @@ class SpatialIndex:
             _, bounds = self.objects[obj_id]
             self.idx.delete(obj_id, (
                 bounds.x, bounds.y,
-                bounds.x + bounds.width,
-                bounds.y + bounds.height
+                bounds.x2,
+                bounds.y2
             ))
             del self.objects[obj_id]
     
@@ -227,6 +338,232 @@ class SpatialIndex:
         self._counter = 0
 
 
+class UniformGridIndex:
+    """
+    均匀网格索引，用于快速查找邻近的已放置台球桌
+    
+    单元格边长不小于"台球桌最大边长 + 间距"时，每次查询最多涉及9个单元格
+    """
+    
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[Tuple[int, BilliardTable, Rectangle]]] = {}
+    
+    def _covered_cells(self, min_x: float, min_y: float, max_x: float, max_y: float):
+        """矩形覆盖的所有单元格坐标"""
+        size = self.cell_size
+        for cx in range(int(min_x // size), int(max_x // size) + 1):
+            for cy in range(int(min_y // size), int(max_y // size) + 1):
+                yield (cx, cy)
+    
+    def insert(self, index: int, table: BilliardTable):
+        """插入布局中编号为index的台球桌"""
+        bounds = table.get_bounds()
+        entry = (index, table, bounds)
+        for key in self._covered_cells(bounds.x, bounds.y,
+                                       bounds.x2, bounds.y2):
+            self.cells.setdefault(key, []).append(entry)
+    
+    def query(self, bounds: Rectangle, margin: float) -> List[Tuple[int, BilliardTable, Rectangle]]:
+        """查询与扩展margin后的边界框落在相同单元格中的台球桌，按编号排序"""
+        found = {}
+        for key in self._covered_cells(bounds.x - margin, bounds.y - margin,
+                                       bounds.x2 + margin,
+                                       bounds.y2 + margin):
+            for entry in self.cells.get(key, ()):
+                found[entry[0]] = entry
+        return [found[i] for i in sorted(found)]
+    
+    def clear(self):
+        """清空索引"""
+        self.cells.clear()
+
+
+def _aabb_feasible_loop(x1: float, y1: float, x2: float, y2: float,
+                        placed: np.ndarray, obstacles: np.ndarray,
+                        table_distance: float, obstacle_distance: float) -> bool:
+    """逐个比较包围盒间距的平方，遇到距离不足时立即返回（供numba编译）"""
+    table_sq = table_distance * table_distance
+    obstacle_sq = obstacle_distance * obstacle_distance
+    for i in range(placed.shape[0]):
+        dx = max(0.0, max(placed[i, 0] - x2, x1 - placed[i, 2]))
+        dy = max(0.0, max(placed[i, 1] - y2, y1 - placed[i, 3]))
+        if dx * dx + dy * dy < table_sq:
+            return False
+    for i in range(obstacles.shape[0]):
+        dx = max(0.0, max(obstacles[i, 0] - x2, x1 - obstacles[i, 2]))
+        dy = max(0.0, max(obstacles[i, 1] - y2, y1 - obstacles[i, 3]))
+        if dx * dx + dy * dy < obstacle_sq:
+            return False
+    return True
+
+
+def _aabb_feasible_numpy(x1: float, y1: float, x2: float, y2: float,
+                         placed: np.ndarray, obstacles: np.ndarray,
+                         table_distance: float, obstacle_distance: float) -> bool:
+    """一次广播计算候选位置到所有台球桌和障碍物的距离平方"""
+    for boxes, min_dist in ((placed, table_distance), (obstacles, obstacle_distance)):
+        if len(boxes):
+            dx = np.maximum(0, np.maximum(boxes[:, 0] - x2, x1 - boxes[:, 2]))
+            dy = np.maximum(0, np.maximum(boxes[:, 1] - y2, y1 - boxes[:, 3]))
+            if (dx * dx + dy * dy < min_dist * min_dist).any():
+                return False
+    return True
+
+
+if njit is not None:
+    aabb_feasible = njit(cache=True)(_aabb_feasible_loop)
+else:
+    aabb_feasible = _aabb_feasible_numpy
+
+
+class PlacementKernel:
+    """
+    已放置台球桌和障碍物的包围盒数组 (min_x, min_y, max_x, max_y)
+    
+    check() 只比较包围盒间距，是距离约束的必要条件：返回 False 的候选位置一定
+    不满足约束，返回 True 的仍需交给 ConstraintSolver.try_add 做完整检查
+    （墙壁距离等）。数组在每次布局生成时建立一次，放置台球桌后用 add() 追加
+    
+    给定 table_size 时按台球桌尺寸预先算好两个方向的包围盒尺寸，check_at()
+    只需候选坐标和方向，被排除的候选位置不必创建 BilliardTable
+    """
+    
+    def __init__(self, obstacles: List[Rectangle], table_distance: float, obstacle_distance: float,
+                 layout: Optional[List[BilliardTable]] = None,
+                 table_size: Optional[Tuple[float, float]] = None):
+        self.table_distance = float(table_distance)
+        self.obstacle_distance = float(obstacle_distance)
+        self.obstacles = Rectangle.stack(obstacles)
+        self._placed = np.empty((16, 4), dtype=np.float64)
+        self.count = 0
+        if table_size is not None:
+            width, height = table_size
+            self._extent = {0: (width, height), 90: (height, width)}
+        for table in layout or []:
+            self.add(table)
+    
+    def _feasible(self, x1: float, y1: float, x2: float, y2: float) -> bool:
+        return bool(aabb_feasible(x1, y1, x2, y2, self._placed[:self.count], self.obstacles,
+                                  self.table_distance, self.obstacle_distance))
+    
+    def check(self, table: BilliardTable) -> bool:
+        """台球桌与所有已放置台球桌和障碍物的包围盒间距是否足够"""
+        bounds = table.get_bounds()
+        return self._feasible(bounds.x, bounds.y, bounds.x2, bounds.y2)
+    
+    def check_at(self, x: float, y: float, rotation: int = 0) -> bool:
+        """同 check()，台球桌由左下角坐标和方向给出（需要创建时提供 table_size）"""
+        width, height = self._extent[90 if rotation == 90 else 0]
+        return self._feasible(x, y, x + width, y + height)
+    
+    def add(self, table: BilliardTable):
+        """记录新放置的台球桌"""
+        if self.count == len(self._placed):
+            self._placed = np.concatenate([self._placed, np.empty_like(self._placed)])
+        bounds = table.get_bounds()
+        self._placed[self.count] = (bounds.x, bounds.y, bounds.x2, bounds.y2)
+        self.count += 1
+
+
+def axis_aligned_bounds(boundary: List[Tuple[float, float]]) -> Optional[Tuple[float, float, float, float]]:
+    """
+    如果场地边界是轴对齐矩形，返回 (min_x, min_y, max_x, max_y)，否则返回 None
+    """
+    points = [tuple(p) for p in boundary]
+    if len(points) == 5 and points[0] == points[-1]:
+        points = points[:-1]
+    if len(points) != 4:
+        return None
+    
+    xs = sorted(set(p[0] for p in points))
+    ys = sorted(set(p[1] for p in points))
+    if len(xs) != 2 or len(ys) != 2:
+        return None
+    
+    # 四个角点必须各出现一次，且相邻顶点沿坐标轴相连
+    corners = {(x, y) for x in xs for y in ys}
+    if set(points) != corners:
+        return None
+    for i in range(4):
+        (x1, y1), (x2, y2) = points[i], points[(i + 1) % 4]
+        if x1 != x2 and y1 != y2:
+            return None
+    
+    return (xs[0], ys[0], xs[1], ys[1])
+
+
+def grid_positions(start: float, end: float, size: float, step: float) -> List[float]:
+    """从start开始、步长为step，且 位置 + size 不超过end 的所有坐标"""
+    if start + size > end:
+        return []
+    count = int((end - size - start) // step) + 1
+    return [start + step * i for i in range(count)]
+
+
+def gap_squared(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    两组轴对齐包围盒之间距离的平方（重叠时为0）
+    
+    a、b 的最后一维为 min_x, min_y, max_x, max_y，其余维度按 NumPy 规则广播，
+    例如 a[:, None] 与 b[None, :] 得到 (N, M) 的距离平方矩阵
+    """
+    dx = np.maximum(0, np.maximum(a[..., 0] - b[..., 2], b[..., 0] - a[..., 2]))
+    dy = np.maximum(0, np.maximum(a[..., 1] - b[..., 3], b[..., 1] - a[..., 3]))
+    return dx * dx + dy * dy
+
+
+def candidates_vs_obstacles(cands: np.ndarray, obs: np.ndarray, min_dist: float) -> np.ndarray:
+    """
+    批量判断候选位置是否与所有障碍物保持足够距离
+    
+    Args:
+        cands: 候选包围盒 (N, 4)，列为 min_x, min_y, max_x, max_y
+        obs: 障碍物包围盒 (M, 4)
+        min_dist: 最小距离
+        
+    Returns:
+        (N,) 布尔数组，True 表示与所有障碍物的距离都不小于 min_dist
+    """
+    # 障碍物向外扩展 min_dist 后的包围盒：不与任何扩展包围盒重叠的候选位置一定满足距离要求
+    inflated = obs + np.array([-min_dist, -min_dist, min_dist, min_dist])
+    overlap = ((cands[:, None, 2] > inflated[None, :, 0]) & (cands[:, None, 0] < inflated[None, :, 2]) &
+               (cands[:, None, 3] > inflated[None, :, 1]) & (cands[:, None, 1] < inflated[None, :, 3]))
+    
+    # 扩展包围盒的四角是方的，而实际距离在角部是圆弧，只对重叠的候选对精确比较距离平方
+    clear = np.ones(len(cands), dtype=bool)
+    rows, cols = np.nonzero(overlap)
+    if len(rows):
+        clear[rows[gap_squared(cands[rows], obs[cols]) < min_dist * min_dist]] = False
+    return clear
+
+
+@lru_cache(maxsize=64)
+def _polygon_from_points(points: Tuple[Tuple[float, float], ...]) -> Polygon:
+    return Polygon(points)
+
+
+def field_polygon(boundary: List[Tuple[float, float]]) -> Polygon:
+    """
+    场地边界多边形，相同边界复用同一个对象
+    
+    shapely几何对象不可变，多个生成器和验证上下文可以共享
+    """
+    return _polygon_from_points(tuple(tuple(p) for p in boundary))
+
+
+@lru_cache(maxsize=64)
+def _rect_from_points(points: Tuple[Tuple[float, float], ...]) -> Optional[Tuple[float, float, float, float]]:
+    return axis_aligned_bounds(points)
+
+
+def field_rect(boundary: List[Tuple[float, float]]) -> Optional[Tuple[float, float, float, float]]:
+    """
+    带缓存的 axis_aligned_bounds，相同边界只判断一次
+    """
+    return _rect_from_points(tuple(tuple(p) for p in boundary))
+
+
 class ConstraintSolver:
     """约束求解器"""
     
@@ -256,6 +593,22 @@ class ConstraintSolver:
         
         return len(violations) == 0, violations
     
+    def try_add(self, table: BilliardTable, layout: List[BilliardTable], context: Dict) -> Tuple[bool, List[ConstraintViolation]]:
+        """
+        检查能否向已满足约束的布局中添加台球桌
+        
+        只检查新台球桌相关的约束，结果与 validate_layout(layout + [table]) 一致，
+        但不复制布局、不重建空间索引
+        """
+        violations = []
+        
+        for constraint in self.constraints:
+            satisfied, violation = constraint.check_addition(table, layout, context)
+            if not satisfied and violation:
+                violations.append(violation)
+        
+        return len(violations) == 0, violations
+    
     def find_conflicts(self, table: BilliardTable, layout: List[BilliardTable], context: Dict) -> List[ConstraintViolation]:
         """查找单个台球桌的约束冲突"""
         violations = []
@@ -8,8 +8,8 @@ from dataclasses import dataclass
 import copy
 
 from .maxrects import Rectangle, BilliardTable
-from .constraints import ConstraintSolver, DistanceConstraint
-from shapely.geometry import Polygon
+from .constraints import ConstraintSolver, DistanceConstraint, PlacementKernel, field_polygon
+from .layout_cache import cached_layout
 
 
 @dataclass
@@ -30,6 +30,7 @@ class EnhancedLayoutGenerator:
         self.table_distance = config.get('table_distance', 1400)
         self.table_width = config.get('table_width', 2850)
         self.table_height = config.get('table_height', 1550)
+        self.use_layout_cache = config.get('use_layout_cache', True)
         
         # 创建约束求解器
         self.constraint_solver = ConstraintSolver()
@@ -39,6 +40,12 @@ class EnhancedLayoutGenerator:
     
     def generate_layout(self, boundary: List[Tuple[float, float]], 
                        obstacles: List[Rectangle]) -> List[BilliardTable]:
+        """生成增强布局，相同输入复用缓存结果"""
+        return cached_layout(self, boundary, obstacles,
+                             lambda: self._generate_layout(boundary, obstacles))
+    
+    def _generate_layout(self, boundary: List[Tuple[float, float]], 
+                         obstacles: List[Rectangle]) -> List[BilliardTable]:
         """
         生成增强布局
         
@@ -50,7 +57,7 @@ class EnhancedLayoutGenerator:
         print("\n=== 增强布局算法 ===")
         
         # 创建验证上下文
-        boundary_polygon = Polygon(boundary)
+        boundary_polygon = field_polygon(boundary)
         context = {
             'boundary': boundary,
             'boundary_polygon': boundary_polygon,
@@ -163,6 +170,9 @@ class EnhancedLayoutGenerator:
         start_x += offset_x
         start_y += offset_y
         
+        kernel = PlacementKernel(context.get('obstacles', []), self.table_distance, self.wall_distance,
+                                 table_size=(self.table_width, self.table_height))
+        
         # 放置台球桌
         for row in range(max_rows):
             for col in range(max_cols):
@@ -175,14 +185,15 @@ class EnhancedLayoutGenerator:
                 if y + table_h > max_y - self.wall_distance:
                     continue
                 
-                table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
-                
-                # 检查约束
-                temp_layout = layout + [table]
-                valid, _ = self.constraint_solver.validate_layout(temp_layout, context)
+                # 检查约束（先用包围盒间距快速排除）
+                valid = kernel.check_at(x, y, rotation)
+                if valid:
+                    table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
+                    valid, _ = self.constraint_solver.try_add(table, layout, context)
                 
                 if valid:
                     layout.append(table)
+                    kernel.add(table)
         
         return layout
     
@@ -200,7 +211,7 @@ class EnhancedLayoutGenerator:
         upper_obstacles = [obs for obs in obstacles if obs.y + obs.height/2 < mid_y]
         upper_context = {
             'boundary': upper_boundary,
-            'boundary_polygon': Polygon(upper_boundary),
+            'boundary_polygon': field_polygon(upper_boundary),
             'obstacles': upper_obstacles
         }
         upper_layout = self._create_grid_layout(upper_boundary, upper_obstacles, upper_context, 0)
@@ -210,7 +221,7 @@ class EnhancedLayoutGenerator:
         lower_obstacles = [obs for obs in obstacles if obs.y + obs.height/2 >= mid_y]
         lower_context = {
             'boundary': lower_boundary,
-            'boundary_polygon': Polygon(lower_boundary),
+            'boundary_polygon': field_polygon(lower_boundary),
             'obstacles': lower_obstacles
         }
         lower_layout = self._create_grid_layout(lower_boundary, lower_obstacles, lower_context, 90)
@@ -277,7 +288,7 @@ class EnhancedLayoutGenerator:
         # 在区域内尝试最佳方向
         region_context = {
             'boundary': region,
-            'boundary_polygon': Polygon(region),
+            'boundary_polygon': field_polygon(region),
             'obstacles': obstacles
         }
         
@@ -294,6 +305,15 @@ class EnhancedLayoutGenerator:
         if not layout:
             return layout
         
+        # 原布局本身不满足约束时无法再添加任何台球桌
+        valid, _ = self.constraint_solver.validate_layout(layout, context)
+        if not valid:
+            print("  对齐填充: 新增 0 个台球桌")
+            print("  自由填充: 新增 0 个台球桌")
+            return layout
+        kernel = PlacementKernel(context.get('obstacles', []), self.table_distance, self.wall_distance, layout,
+                                 table_size=(self.table_width, self.table_height))
+        
         min_x = min(p[0] for p in boundary)
         max_x = max(p[0] for p in boundary)
         min_y = min(p[1] for p in boundary)
@@ -338,12 +358,14 @@ class EnhancedLayoutGenerator:
         
         # 尝试对齐位置
         for x, y, rotation in aligned_positions:
-            table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
-            temp_layout = layout + [table]
-            valid, _ = self.constraint_solver.validate_layout(temp_layout, context)
+            valid = kernel.check_at(x, y, rotation)
+            if valid:
+                table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
+                valid, _ = self.constraint_solver.try_add(table, layout, context)
             
             if valid:
                 layout.append(table)
+                kernel.add(table)
                 added_count += 1
         
         print(f"  对齐填充: 新增 {added_count} 个台球桌")
@@ -366,12 +388,14 @@ class EnhancedLayoutGenerator:
                         if y + height > max_y - self.wall_distance:
                             continue
                         
-                        table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
-                        temp_layout = layout + [table]
-                        valid, _ = self.constraint_solver.validate_layout(temp_layout, context)
+                        valid = kernel.check_at(x, y, rotation)
+                        if valid:
+                            table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
+                            valid, _ = self.constraint_solver.try_add(table, layout, context)
                         
                         if valid:
                             layout.append(table)
+                            kernel.add(table)
                             free_added += 1
                             break
             
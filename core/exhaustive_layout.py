@@ -8,8 +8,7 @@ from dataclasses import dataclass
 import itertools
 
 from .maxrects import Rectangle, BilliardTable
-from .constraints import ConstraintSolver, DistanceConstraint
-from shapely.geometry import Polygon
+from .constraints import ConstraintSolver, DistanceConstraint, field_polygon
 
 
 class ExhaustiveLayoutGenerator:
@@ -40,7 +39,7 @@ class ExhaustiveLayoutGenerator:
         max_y = max(p[1] for p in boundary)
         
         # 创建验证上下文
-        boundary_polygon = Polygon(boundary)
+        boundary_polygon = field_polygon(boundary)
         context = {
             'boundary': boundary,
             'boundary_polygon': boundary_polygon,
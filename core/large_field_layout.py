@@ -8,8 +8,7 @@ import math
 from dataclasses import dataclass
 
 from .maxrects import Rectangle, BilliardTable
-from .constraints import ConstraintSolver, DistanceConstraint
-from shapely.geometry import Polygon
+from .constraints import ConstraintSolver, DistanceConstraint, field_polygon
 
 
 class LargeFieldLayoutGenerator:
@@ -55,7 +54,7 @@ class LargeFieldLayoutGenerator:
         print(f"场地尺寸: {field_width/1000:.1f}m × {field_height/1000:.1f}m")
         
         # 创建验证上下文
-        boundary_polygon = Polygon(boundary)
+        boundary_polygon = field_polygon(boundary)
         context = {
             'boundary': boundary,
             'boundary_polygon': boundary_polygon,
@@ -174,7 +173,7 @@ class LargeFieldLayoutGenerator:
                 valid = True
                 table_bounds = table.get_bounds()
                 for obstacle in obstacles:
-                    if table_bounds.distance_to(obstacle) < self.wall_distance:
+                    if table_bounds.distance_to_squared(obstacle) < self.wall_distance ** 2:
                         valid = False
                         break
                 
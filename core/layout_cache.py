@@ -0,0 +1,79 @@
+"""
+布局结果缓存
+相同场地、障碍物和配置重复生成布局时直接复用之前的结果
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+from .maxrects import Rectangle, BilliardTable
+
+
+# 最多缓存的布局数量，超出后淘汰最久未使用的结果
+CACHE_SIZE = 32
+
+_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _make_key(generator, boundary, obstacles, extra: tuple) -> Optional[tuple]:
+    """
+    生成缓存键，输入无法哈希时返回 None
+    
+    布局只取决于间距和台球桌尺寸，配置中 optimize_count、use_enhanced_algorithm
+    等选择算法的开关不计入缓存键，切换开关后同一生成器仍能复用结果
+    """
+    key = (
+        type(generator).__name__,
+        (generator.wall_distance, generator.table_distance,
+         generator.table_width, generator.table_height),
+        tuple(tuple(p) for p in boundary),
+        tuple((o.x, o.y, o.width, o.height) for o in obstacles),
+        extra
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def cached_layout(generator, boundary: List[Tuple[float, float]], obstacles: List[Rectangle],
+                  compute: Callable[[], List[BilliardTable]], *extra) -> List[BilliardTable]:
+    """
+    返回 compute() 生成的布局，相同输入再次调用时直接使用缓存
+
+    缓存中保存的是台球桌坐标，每次都返回新的 BilliardTable 对象，
+    调用方修改返回的布局不会影响缓存；生成器配置 use_layout_cache 为 False 时
+    不读写缓存，每次都重新计算（用于计时对比）
+    """
+    if not getattr(generator, 'use_layout_cache', True):
+        return compute()
+
+    key = _make_key(generator, boundary, obstacles, extra)
+    if key is None:
+        return compute()
+
+    with _lock:
+        frozen = _cache.get(key)
+        if frozen is not None:
+            _cache.move_to_end(key)
+
+    if frozen is None:
+        layout = compute()
+        frozen = tuple((t.x, t.y, t.width, t.height, t.rotation) for t in layout)
+        with _lock:
+            _cache[key] = frozen
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    else:
+        print(f"使用缓存的布局结果: {len(frozen)}个台球桌")
+
+    return [BilliardTable(*t) for t in frozen]
+
+
+def clear_layout_cache():
+    """清空布局缓存"""
+    with _lock:
+        _cache.clear()
@@ -4,12 +4,12 @@
 
 import numpy as np
 from typing import List, Tuple, Dict, Optional
+from collections import Counter
 from dataclasses import dataclass
 from enum import Enum
 
 from .maxrects import Rectangle, BilliardTable
-from .constraints import ConstraintSolver, DistanceConstraint
-from shapely.geometry import Polygon
+from .constraints import ConstraintSolver, DistanceConstraint, field_polygon
 
 
 class ValidationLevel(Enum):
@@ -58,7 +58,7 @@ class LayoutValidator:
         # 创建验证上下文
         context = {
             'boundary': boundary,
-            'boundary_polygon': Polygon(boundary),
+            'boundary_polygon': field_polygon(boundary),
             'obstacles': obstacles
         }
         
@@ -266,8 +266,8 @@ class LayoutValidator:
         if not layout:
             return 1.0
         
-        horizontal_count = sum(1 for t in layout if t.rotation == 0)
-        vertical_count = sum(1 for t in layout if t.rotation == 90)
+        rotations = Counter(t.rotation for t in layout)
+        horizontal_count, vertical_count = rotations[0], rotations[90]
         
         total = len(layout)
         dominant_ratio = max(horizontal_count, vertical_count) / total
@@ -3,18 +3,38 @@
 用于台球桌自动布局优化
 """
 
+import sys
 from typing import List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import numpy as np
 
+# dataclass 的 slots 参数需要 Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 
 @dataclass
 class Rectangle:
-    """矩形类，表示可用空间或台球桌"""
+    """
+    矩形类，表示可用空间或台球桌
+    
+    右上角坐标 x2, y2 在创建时计算一次，创建后不应再修改坐标和尺寸
+    """
     x: float
     y: float
     width: float
     height: float
+    x2: float = field(init=False, repr=False, compare=False)
+    y2: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.x2 = self.x + self.width
+        self.y2 = self.y + self.height
+    
+    @classmethod
+    def stack(cls, rects: List['Rectangle']) -> np.ndarray:
+        """矩形列表转换为 (N, 4) 数组，列为 min_x, min_y, max_x, max_y"""
+        return np.array([(r.x, r.y, r.x2, r.y2) for r in rects],
+                        dtype=np.float64).reshape(-1, 4)
     
     def area(self) -> float:
         """计算矩形面积"""
@@ -22,28 +42,29 @@ class Rectangle:
     
     def contains_point(self, x: float, y: float) -> bool:
         """检查点是否在矩形内"""
-        return (self.x <= x <= self.x + self.width and 
-                self.y <= y <= self.y + self.height)
+        return self.x <= x <= self.x2 and self.y <= y <= self.y2
     
     def intersects(self, other: 'Rectangle') -> bool:
         """检查两个矩形是否相交"""
-        return not (self.x + self.width <= other.x or
-                   other.x + other.width <= self.x or
-                   self.y + self.height <= other.y or
-                   other.y + other.height <= self.y)
+        return not (self.x2 <= other.x or other.x2 <= self.x or
+                    self.y2 <= other.y or other.y2 <= self.y)
     
     def distance_to(self, other: 'Rectangle') -> float:
         """计算两个矩形之间的最短距离"""
+        return np.sqrt(self.distance_to_squared(other))
+    
+    def distance_to_squared(self, other: 'Rectangle') -> float:
+        """两个矩形之间最短距离的平方，只需与阈值比较时可以省去开方"""
         # 计算x方向距离
-        dx = max(0, max(other.x - (self.x + self.width), self.x - (other.x + other.width)))
+        dx = max(0, other.x - self.x2, self.x - other.x2)
         # 计算y方向距离
-        dy = max(0, max(other.y - (self.y + self.height), self.y - (other.y + other.height)))
-        return np.sqrt(dx**2 + dy**2)
+        dy = max(0, other.y - self.y2, self.y - other.y2)
+        return dx**2 + dy**2
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class BilliardTable:
-    """台球桌类"""
+    """台球桌类（使用__slots__，大量创建候选位置时更省内存）"""
     x: float
     y: float
     width: float = 2850  # 默认宽度 2850mm
@@ -148,7 +169,7 @@ class MaxRectsAlgorithm:
                 splits = self._split_rectangle(free_rect, expanded_obstacle)
                 new_free_rectangles.extend(splits)
         
-        self.free_rectangles = new_free_rectangles
+        self.free_rectangles = self._prune_free_rectangles(new_free_rectangles)
     
     def _split_rectangle(self, rect: Rectangle, obstacle: Rectangle) -> List[Rectangle]:
         """将矩形按障碍物分割"""
@@ -162,10 +183,10 @@ class MaxRectsAlgorithm:
             ))
         
         # 右侧部分
-        if obstacle.x + obstacle.width < rect.x + rect.width:
+        if obstacle.x2 < rect.x2:
             splits.append(Rectangle(
-                obstacle.x + obstacle.width, rect.y,
-                rect.x + rect.width - obstacle.x - obstacle.width, rect.height
+                obstacle.x2, rect.y,
+                rect.x2 - obstacle.x - obstacle.width, rect.height
             ))
         
         # 上侧部分
@@ -176,10 +197,10 @@ class MaxRectsAlgorithm:
             ))
         
         # 下侧部分
-        if obstacle.y + obstacle.height < rect.y + rect.height:
+        if obstacle.y2 < rect.y2:
             splits.append(Rectangle(
-                rect.x, obstacle.y + obstacle.height,
-                rect.width, rect.y + rect.height - obstacle.y - obstacle.height
+                rect.x, obstacle.y2,
+                rect.width, rect.y2 - obstacle.y - obstacle.height
             ))
         
         return [s for s in splits if s.width > 0 and s.height > 0]
@@ -199,19 +220,19 @@ class MaxRectsAlgorithm:
                 # 尝试多个位置：左下、左上、右下、右上、中心
                 positions = [
                     (free_rect.x, free_rect.y),  # 左下
-                    (free_rect.x, free_rect.y + free_rect.height - height),  # 左上
-                    (free_rect.x + free_rect.width - width, free_rect.y),  # 右下
-                    (free_rect.x + free_rect.width - width, free_rect.y + free_rect.height - height),  # 右上
+                    (free_rect.x, free_rect.y2 - height),  # 左上
+                    (free_rect.x2 - width, free_rect.y),  # 右下
+                    (free_rect.x2 - width, free_rect.y2 - height),  # 右上
                     (free_rect.x + (free_rect.width - width) / 2, free_rect.y + (free_rect.height - height) / 2)  # 中心
                 ]
                 
                 for x, y in positions:
                     # 确保位置有效
-                    if x >= free_rect.x and y >= free_rect.y and x + width <= free_rect.x + free_rect.width and y + height <= free_rect.y + free_rect.height:
+                    if x >= free_rect.x and y >= free_rect.y and x + width <= free_rect.x2 and y + height <= free_rect.y2:
                         # 计算评分：优先填充角落和边缘
                         edge_score = min(x - free_rect.x, y - free_rect.y, 
-                                       free_rect.x + free_rect.width - x - width,
-                                       free_rect.y + free_rect.height - y - height)
+                                       free_rect.x2 - x - width,
+                                       free_rect.y2 - y - height)
                         score = -edge_score  # 负值因为我们想要最小化边缘距离
                         candidates.append((x, y, 0, score))
             
@@ -219,17 +240,17 @@ class MaxRectsAlgorithm:
             if free_rect.width >= height and free_rect.height >= width:
                 positions = [
                     (free_rect.x, free_rect.y),
-                    (free_rect.x, free_rect.y + free_rect.height - width),
-                    (free_rect.x + free_rect.width - height, free_rect.y),
-                    (free_rect.x + free_rect.width - height, free_rect.y + free_rect.height - width),
+                    (free_rect.x, free_rect.y2 - width),
+                    (free_rect.x2 - height, free_rect.y),
+                    (free_rect.x2 - height, free_rect.y2 - width),
                     (free_rect.x + (free_rect.width - height) / 2, free_rect.y + (free_rect.height - width) / 2)
                 ]
                 
                 for x, y in positions:
-                    if x >= free_rect.x and y >= free_rect.y and x + height <= free_rect.x + free_rect.width and y + width <= free_rect.y + free_rect.height:
+                    if x >= free_rect.x and y >= free_rect.y and x + height <= free_rect.x2 and y + width <= free_rect.y2:
                         edge_score = min(x - free_rect.x, y - free_rect.y,
-                                       free_rect.x + free_rect.width - x - height,
-                                       free_rect.y + free_rect.height - y - width)
+                                       free_rect.x2 - x - height,
+                                       free_rect.y2 - y - width)
                         score = -edge_score
                         candidates.append((x, y, 90, score))
         
@@ -260,23 +281,23 @@ class MaxRectsAlgorithm:
         # 检查台球桌是否太靠近墙壁
         if (table_bounds.x < min_x + self.wall_distance or
             table_bounds.y < min_y + self.wall_distance or
-            table_bounds.x + table_bounds.width > max_x - self.wall_distance or
-            table_bounds.y + table_bounds.height > max_y - self.wall_distance):
+            table_bounds.x2 > max_x - self.wall_distance or
+            table_bounds.y2 > max_y - self.wall_distance):
             print(f"拒绝放置：台球桌 ({table_bounds.x:.0f}, {table_bounds.y:.0f}) 太靠近墙壁")
             return False
         
         # 检查是否与已放置的台球桌冲突
         for i, placed in enumerate(self.placed_tables):
             placed_bounds = placed.get_bounds()
-            distance = table_bounds.distance_to(placed_bounds)
-            if distance < self.table_distance:
+            if table_bounds.distance_to_squared(placed_bounds) < self.table_distance ** 2:
+                distance = table_bounds.distance_to(placed_bounds)
                 print(f"拒绝放置：与台球桌{i}距离{distance:.0f}mm < {self.table_distance}mm")
                 return False
         
         # 检查是否与障碍物冲突
         for j, obstacle in enumerate(self.obstacles):
-            distance = table_bounds.distance_to(obstacle)
-            if distance < self.wall_distance:
+            if table_bounds.distance_to_squared(obstacle) < self.wall_distance ** 2:
+                distance = table_bounds.distance_to(obstacle)
                 print(f"拒绝放置：与障碍物{j}距离{distance:.0f}mm < {self.wall_distance}mm")
                 return False
         
@@ -300,8 +321,32 @@ class MaxRectsAlgorithm:
                 splits = self._split_rectangle(free_rect, safety_bounds)
                 new_free_rectangles.extend(splits)
         
-        # 合并相邻的矩形以优化性能（可选）
-        self.free_rectangles = self._merge_rectangles(new_free_rectangles)
+        # 移除被包含的矩形，再合并相邻的矩形以优化性能（可选）
+        self.free_rectangles = self._merge_rectangles(self._prune_free_rectangles(new_free_rectangles))
+    
+    def _prune_free_rectangles(self, rectangles: List[Rectangle]) -> List[Rectangle]:
+        """
+        移除被排在前面的可用矩形完全包含的矩形
+        
+        前面的矩形中心位置评分不低于被包含矩形的任何候选位置，且排序时先出现，
+        所以移除后 find_best_position 的结果不变。
+        按台球桌宽度划分网格，每个矩形登记到它覆盖的所有单元格；包含矩形A的矩形
+        必然覆盖A左下角所在的单元格，因此只需比较该单元格中的矩形
+        """
+        cell = self.table_width
+        buckets = {}
+        pruned = []
+        for rect in rectangles:
+            key = (int(rect.x // cell), int(rect.y // cell))
+            if any(other.x <= rect.x and other.y <= rect.y and
+                   rect.x2 <= other.x2 and rect.y2 <= other.y2
+                   for other in buckets.get(key, ())):
+                continue
+            pruned.append(rect)
+            for cx in range(key[0], int(rect.x2 // cell) + 1):
+                for cy in range(key[1], int(rect.y2 // cell) + 1):
+                    buckets.setdefault((cx, cy), []).append(rect)
+        return pruned
     
     def _merge_rectangles(self, rectangles: List[Rectangle]) -> List[Rectangle]:
         """合并相邻的矩形（简化版本）"""
@@ -7,8 +7,8 @@ from typing import List, Tuple, Dict, Optional
 from dataclasses import dataclass
 
 from .maxrects import Rectangle, BilliardTable
-from .constraints import ConstraintSolver, DistanceConstraint
-from shapely.geometry import Polygon, box
+from .constraints import ConstraintSolver, DistanceConstraint, field_polygon
+from shapely.geometry import box
 from rtree import index
 
 
@@ -48,7 +48,7 @@ class ObstacleAwareLayoutGenerator:
         max_y = max(p[1] for p in boundary)
         
         # 创建验证上下文
-        boundary_polygon = Polygon(boundary)
+        boundary_polygon = field_polygon(boundary)
         context = {
             'boundary': boundary,
             'boundary_polygon': boundary_polygon,
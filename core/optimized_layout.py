@@ -4,23 +4,29 @@
 
 import numpy as np
 from typing import List, Tuple, Dict, Optional
+from collections import Counter
 from dataclasses import dataclass
 
 from .maxrects import Rectangle, BilliardTable
-from .constraints import ConstraintSolver, DistanceConstraint
+from .constraints import ConstraintSolver, DistanceConstraint, PlacementKernel, field_polygon, grid_positions
 from .enhanced_layout import EnhancedLayoutGenerator
-from shapely.geometry import Polygon
+from .layout_cache import cached_layout
 
 
 class OptimizedLayoutGenerator:
     """优化布局生成器 - 通过灵活放置最大化台球桌数量"""
     
     def __init__(self, config: Dict):
+        self.update_config(config)
+    
+    def update_config(self, config: Dict):
+        """更新间距和台球桌尺寸配置，并重建约束求解器，便于同一个生成器测试多组参数"""
         self.config = config
         self.wall_distance = config.get('wall_distance', 1500)
         self.table_distance = config.get('table_distance', 1400)
         self.table_width = config.get('table_width', 2850)
         self.table_height = config.get('table_height', 1550)
+        self.use_layout_cache = config.get('use_layout_cache', True)
         
         # 创建约束求解器
         self.constraint_solver = ConstraintSolver()
@@ -30,6 +36,12 @@ class OptimizedLayoutGenerator:
     
     def generate_layout(self, boundary: List[Tuple[float, float]], 
                        obstacles: List[Rectangle]) -> List[BilliardTable]:
+        """生成优化布局，相同输入复用缓存结果"""
+        return cached_layout(self, boundary, obstacles,
+                             lambda: self._generate_layout(boundary, obstacles))
+    
+    def _generate_layout(self, boundary: List[Tuple[float, float]], 
+                         obstacles: List[Rectangle]) -> List[BilliardTable]:
         """
         生成优化布局，最大化台球桌数量
         
@@ -57,7 +69,7 @@ class OptimizedLayoutGenerator:
         max_y = max(p[1] for p in boundary)
         
         # 创建验证上下文
-        boundary_polygon = Polygon(boundary)
+        boundary_polygon = field_polygon(boundary)
         context = {
             'boundary': boundary,
             'boundary_polygon': boundary_polygon,
@@ -127,8 +139,8 @@ class OptimizedLayoutGenerator:
             print(f"\n最终布局: {len(best_layout)}个台球桌")
             
             # 显示布局统计
-            horizontal_count = sum(1 for t in best_layout if t.rotation == 0)
-            vertical_count = sum(1 for t in best_layout if t.rotation == 90)
+            rotations = Counter(t.rotation for t in best_layout)
+            horizontal_count, vertical_count = rotations[0], rotations[90]
             print(f"  横向: {horizontal_count}个, 纵向: {vertical_count}个")
             
             # 计算空间利用率
@@ -160,22 +172,23 @@ class OptimizedLayoutGenerator:
         step_x = table_w + self.table_distance
         step_y = table_h + self.table_distance
         
-        # 从左上角开始放置
-        y = min_y + self.wall_distance
-        while y + table_h <= max_y - self.wall_distance:
-            x = min_x + self.wall_distance
-            while x + table_w <= max_x - self.wall_distance:
-                table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
-                
-                # 验证约束
-                temp_layout = layout + [table]
-                valid, _ = self.constraint_solver.validate_layout(temp_layout, context)
+        kernel = PlacementKernel(obstacles, self.table_distance, self.wall_distance,
+                                 table_size=(self.table_width, self.table_height))
+        
+        # 从左上角开始放置，行列坐标一次算出
+        xs = grid_positions(min_x + self.wall_distance, max_x - self.wall_distance, table_w, step_x)
+        ys = grid_positions(min_y + self.wall_distance, max_y - self.wall_distance, table_h, step_y)
+        for y in ys:
+            for x in xs:
+                # 验证约束（先用包围盒间距快速排除）
+                valid = kernel.check_at(x, y, rotation)
+                if valid:
+                    table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
+                    valid, _ = self.constraint_solver.try_add(table, layout, context)
                 
                 if valid:
                     layout.append(table)
-                
-                x += step_x
-            y += step_y
+                    kernel.add(table)
         
         return layout
     
@@ -183,6 +196,8 @@ class OptimizedLayoutGenerator:
         """混合填充布局 - 先放横向，再在空隙填充纵向"""
         # 先获取横向布局
         layout = self._try_single_orientation_layout(boundary, obstacles, context, 0)
+        kernel = PlacementKernel(obstacles, self.table_distance, self.wall_distance, layout,
+                                 table_size=(self.table_width, self.table_height))
         
         min_x = min(p[0] for p in boundary)
         max_x = max(p[0] for p in boundary)
@@ -197,13 +212,14 @@ class OptimizedLayoutGenerator:
             x = min_x + self.wall_distance
             while x + self.table_height <= max_x - self.wall_distance:
                 # 尝试放置纵向台球桌
-                table = BilliardTable(x, y, self.table_width, self.table_height, 90)
-                
-                temp_layout = layout + [table]
-                valid, _ = self.constraint_solver.validate_layout(temp_layout, context)
+                valid = kernel.check_at(x, y, 90)
+                if valid:
+                    table = BilliardTable(x, y, self.table_width, self.table_height, 90)
+                    valid, _ = self.constraint_solver.try_add(table, layout, context)
                 
                 if valid:
                     layout.append(table)
+                    kernel.add(table)
                     # 跳过这个台球桌占用的区域
                     x += self.table_height + self.table_distance
                 else:
@@ -225,6 +241,14 @@ class OptimizedLayoutGenerator:
         
         print("  进行精细空隙搜索...")
         
+        # 原布局本身不满足约束时无法再添加任何台球桌
+        valid, _ = self.constraint_solver.validate_layout(layout, context)
+        if not valid:
+            print(f"  精细搜索新增: {added_count}个台球桌")
+            return layout
+        kernel = PlacementKernel(obstacles, self.table_distance, self.wall_distance, layout,
+                                 table_size=(self.table_width, self.table_height))
+        
         # 多轮扫描，每轮使用不同的起始点
         for start_offset in [0, scan_step//2]:
             for y in range(int(min_y + self.wall_distance + start_offset), 
@@ -247,12 +271,14 @@ class OptimizedLayoutGenerator:
                         if y + height > max_y - self.wall_distance:
                             continue
                         
-                        table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
-                        temp_layout = layout + [table]
-                        valid, _ = self.constraint_solver.validate_layout(temp_layout, context)
+                        valid = kernel.check_at(x, y, rotation)
+                        if valid:
+                            table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
+                            valid, _ = self.constraint_solver.try_add(table, layout, context)
                         
                         if valid:
                             layout.append(table)
+                            kernel.add(table)
                             added_count += 1
                             print(f"    发现空隙: 位置({x}, {y}), 方向{rotation}°")
                             break  # 找到一个就跳出方向循环
@@ -44,7 +44,7 @@ class LayoutOptimizer:
         self.constraint_solver.add_constraint(AccessibilityConstraint())
     
     def optimize(self, boundary: List[Tuple[float, float]], obstacles: List[Rectangle], 
-                 use_regular_layout: bool = True) -> Dict:
+                 use_regular_layout: bool = True, optimize_count: Optional[bool] = None) -> Dict:
         """
         执行三阶段优化
         
@@ -52,6 +52,7 @@ class LayoutOptimizer:
             boundary: 场地边界点列表
             obstacles: 障碍物列表
             use_regular_layout: 是否使用规则布局算法
+            optimize_count: 是否最大化台球桌数量，为None时使用配置中的 optimize_count
         
         Returns:
             优化结果字典
@@ -61,7 +62,8 @@ class LayoutOptimizer:
         # 如果使用规则布局算法
         if use_regular_layout:
             # 检查是否需要最大化布局
-            optimize_count = self.config.get('optimize_count', False)
+            if optimize_count is None:
+                optimize_count = self.config.get('optimize_count', False)
             
             if optimize_count:
                 print("使用优化布局算法（最大化数量）...")
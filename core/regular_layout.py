@@ -9,8 +9,8 @@ from dataclasses import dataclass
 from enum import Enum
 
 from .maxrects import Rectangle, BilliardTable
-from .constraints import ConstraintSolver, DistanceConstraint
-from shapely.geometry import Polygon
+from .constraints import ConstraintSolver, DistanceConstraint, field_polygon, grid_positions, candidates_vs_obstacles
+from .layout_cache import cached_layout
 
 
 class LayoutMode(Enum):
@@ -39,6 +39,7 @@ class RegularLayoutGenerator:
         self.table_distance = config.get('table_distance', 1400)
         self.table_width = config.get('table_width', 2850)
         self.table_height = config.get('table_height', 1550)
+        self.use_layout_cache = config.get('use_layout_cache', True)
         
         # 创建约束求解器
         self.constraint_solver = ConstraintSolver()
@@ -49,6 +50,13 @@ class RegularLayoutGenerator:
     def generate_layout(self, boundary: List[Tuple[float, float]], 
                        obstacles: List[Rectangle], 
                        mode: LayoutMode = LayoutMode.AUTO) -> List[BilliardTable]:
+        """生成规则布局，相同输入复用缓存结果"""
+        return cached_layout(self, boundary, obstacles,
+                             lambda: self._generate_layout(boundary, obstacles, mode), mode)
+    
+    def _generate_layout(self, boundary: List[Tuple[float, float]], 
+                         obstacles: List[Rectangle], 
+                         mode: LayoutMode = LayoutMode.AUTO) -> List[BilliardTable]:
         """
         生成规则布局
         
@@ -159,56 +167,45 @@ class RegularLayoutGenerator:
         print(f"  可用宽度: {available_width}, 最大列数: {max_cols}")
         
         # 创建上下文用于验证
-        boundary_polygon = Polygon(boundary)
+        boundary_polygon = field_polygon(boundary)
         context = {
             'boundary': boundary,
             'boundary_polygon': boundary_polygon,
             'obstacles': obstacles
         }
         
-        # 按行列放置
-        y = start_y
-        row = 0
-        while y + table_h <= max_y - self.wall_distance:
-            x = start_x
-            col = 0
+        # 所有候选位置（按行优先排列）及其包围盒
+        x_positions = grid_positions(start_x, max_x - self.wall_distance, table_w, cell_w)
+        y_positions = grid_positions(start_y, max_y - self.wall_distance, table_h, cell_h)
+        positions = [(x, y) for y in y_positions for x in x_positions]
+        xx, yy = np.meshgrid(np.array(x_positions, dtype=np.float64),
+                             np.array(y_positions, dtype=np.float64))
+        cands = np.stack([xx.ravel(), yy.ravel(),
+                          xx.ravel() + table_w, yy.ravel() + table_h], axis=1)
+        
+        # 一次性计算所有候选位置与障碍物的距离
+        obs = Rectangle.stack(obstacles)
+        clear_of_obstacles = candidates_vs_obstacles(cands, obs, self.wall_distance)
+        
+        n_cols = len(x_positions)
+        for k, (x, y) in enumerate(positions):
+            row, col = divmod(k, n_cols)
+            
+            # 创建台球桌
+            table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
             
-            while x + table_w <= max_x - self.wall_distance:
-                # 创建台球桌
-                table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
-                
-                # 检查是否与障碍物冲突
-                valid = True
-                table_bounds = table.get_bounds()
-                
-                # 检查障碍物
-                for i, obstacle in enumerate(obstacles):
-                    dist = table_bounds.distance_to(obstacle)
-                    if dist < self.wall_distance:
-                        valid = False
-                        break
-                
-                # 如果没有障碍物冲突，检查完整约束
-                if valid:
-                    temp_layout = layout + [table]
-                    valid, violations = self.constraint_solver.validate_layout(temp_layout, context)
-                    if not valid and violations:
-                        if isinstance(violations, list) and violations:
-                            print(f"    约束验证失败: {violations[0].description}")
-                        elif hasattr(violations, 'description'):
-                            print(f"    约束验证失败: {violations.description}")
-                
-                if valid:
-                    layout.append(table)
-                    print(f"放置台球桌 #{len(layout)} at ({x:.0f}, {y:.0f}) [行{row+1},列{col+1}]")
-                else:
-                    print(f"  跳过位置 ({x:.0f}, {y:.0f}) [行{row+1},列{col+1}] - 验证失败")
-                
-                x += cell_w
-                col += 1
+            # 如果没有障碍物冲突，检查完整约束
+            valid = bool(clear_of_obstacles[k])
+            if valid:
+                valid, violations = self.constraint_solver.try_add(table, layout, context)
+                if not valid and violations:
+                    print(f"    约束验证失败: {violations[0].description}")
             
-            y += cell_h
-            row += 1
+            if valid:
+                layout.append(table)
+                print(f"放置台球桌 #{len(layout)} at ({x:.0f}, {y:.0f}) [行{row+1},列{col+1}]")
+            else:
+                print(f"  跳过位置 ({x:.0f}, {y:.0f}) [行{row+1},列{col+1}] - 验证失败")
         
         print(f"规则网格布局完成：放置了 {len(layout)} 个台球桌")
         return layout
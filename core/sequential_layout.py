@@ -7,8 +7,7 @@ from typing import List, Tuple, Dict, Optional
 from dataclasses import dataclass
 
 from .maxrects import Rectangle, BilliardTable
-from .constraints import ConstraintSolver, DistanceConstraint
-from shapely.geometry import Polygon
+from .constraints import ConstraintSolver, DistanceConstraint, field_polygon
 
 
 class SequentialLayoutGenerator:
@@ -44,7 +43,7 @@ class SequentialLayoutGenerator:
         max_y = max(p[1] for p in boundary)
         
         # 创建验证上下文
-        boundary_polygon = Polygon(boundary)
+        boundary_polygon = field_polygon(boundary)
         context = {
             'boundary': boundary,
             'boundary_polygon': boundary_polygon,
@@ -2,13 +2,39 @@
 智能网格布局算法 - 核心网格生成逻辑
 """
 
+import functools
 import numpy as np
 from typing import List, Tuple, Dict, Optional
 from dataclasses import dataclass
 
 from .maxrects import Rectangle, BilliardTable
-from .constraints import ConstraintSolver, DistanceConstraint
-from shapely.geometry import Polygon
+from .constraints import ConstraintSolver, DistanceConstraint, UniformGridIndex, axis_aligned_bounds
+import shapely
+from shapely.geometry import Polygon, box
+
+
+@functools.lru_cache(maxsize=256)
+def _grid_capacity(width, height, table_w, table_h, wall_distance, table_distance):
+    """规则网格可容纳的台球桌数量（纯函数，结果可缓存）"""
+    cols = int((width - 2 * wall_distance + table_distance) / (table_w + table_distance))
+    rows = int((height - 2 * wall_distance + table_distance) / (table_h + table_distance))
+    
+    return max(0, cols * rows)
+
+
+# 障碍物数量达到该值时才使用STRtree，数量少时逐个比较更快
+OBSTACLE_TREE_MIN = 32
+
+# 质量评分上限：规则性 (10 + 10) * 5 + 紧凑性 10 * 3
+MAX_QUALITY_SCORE = 130
+
+
+def _bounding_box(points):
+    """点集的边界框 (min_x, min_y, max_x, max_y)"""
+    pts = np.asarray(points, dtype=np.float64)
+    min_x, min_y = pts.min(axis=0).tolist()
+    max_x, max_y = pts.max(axis=0).tolist()
+    return (min_x, min_y, max_x, max_y)
 
 
 @dataclass
@@ -48,11 +74,25 @@ class SmartGridGenerator:
         self.constraint_solver.add_constraint(
             DistanceConstraint(self.wall_distance, self.table_distance, self.wall_distance)
         )
+        
+        # 场地几何缓存（每次生成时刷新）
+        self._boundary = None
+        self._boundary_poly = None
+        self._boundary_bbox = None
+        self._boundary_is_rect = False
+        self._obstacles = None
+        self._obs_xyxy = np.empty((0, 4))
+        self._obs_infl = np.empty((0, 4))
+        self._obs_tree = None
     
     def generate_optimal_grid(self, boundary: List[Tuple[float, float]], 
                             obstacles: List[Rectangle]) -> List[BilliardTable]:
         """生成最优网格布局"""
         
+        # 场地多边形只构建一次，供所有方案共享
+        self._prepare_boundary(boundary)
+        self._prepare_obstacles(obstacles)
+        
         # 分析场地特征
         field_analysis = self._analyze_field(boundary, obstacles)
         
@@ -64,12 +104,69 @@ class SmartGridGenerator:
         
         return best_layout
     
+    def _prepare_boundary(self, boundary):
+        """缓存场地多边形（预处理）和边界框"""
+        self._boundary_poly = Polygon(boundary)
+        shapely.prepare(self._boundary_poly)
+        self._boundary = boundary
+        self._boundary_bbox = _bounding_box(boundary)
+        self._boundary_is_rect = axis_aligned_bounds(boundary) is not None
+    
+    def _bbox(self, boundary):
+        """边界框 (min_x, min_y, max_x, max_y)，当前场地直接返回缓存"""
+        if boundary is self._boundary:
+            return self._boundary_bbox
+        return _bounding_box(boundary)
+    
+    def _prepare_obstacles(self, obstacles):
+        """缓存障碍物的 (min_x, min_y, max_x, max_y) 数组及含安全距离的影响范围"""
+        self._obstacles = obstacles
+        self._obs_xyxy = self._to_xyxy(obstacles)
+        wd = self.wall_distance
+        self._obs_infl = self._obs_xyxy + np.array([[-wd, -wd, wd, wd]], dtype=np.float64)
+        
+        # 障碍物较多时建立空间索引，候选位置只需检查附近的障碍物
+        if len(obstacles) >= OBSTACLE_TREE_MIN:
+            self._obs_tree = shapely.STRtree([box(*xyxy) for xyxy in self._obs_xyxy])
+        else:
+            self._obs_tree = None
+    
+    def _to_xyxy(self, obstacles):
+        """障碍物列表转换为 (O, 4) 数组"""
+        return Rectangle.stack(obstacles)
+    
+    def _obstacle_array(self, obstacles):
+        """获取障碍物数组，当前场地的障碍物直接复用缓存"""
+        if obstacles is self._obstacles:
+            return self._obs_xyxy
+        return self._to_xyxy(obstacles)
+    
+    def _make_context(self, boundary, obstacles):
+        """构建约束验证上下文，场地边界直接复用缓存的几何"""
+        if boundary is self._boundary:
+            polygon = self._boundary_poly
+            rect = self._boundary_bbox if self._boundary_is_rect else None
+        else:
+            polygon = Polygon(boundary)
+            shapely.prepare(polygon)
+            rect = axis_aligned_bounds(boundary)
+        
+        context = {
+            'boundary': boundary,
+            'boundary_polygon': polygon,
+            'obstacles': obstacles,
+            'obstacles_xyxy': self._obstacle_array(obstacles)
+        }
+        # 轴对齐矩形场地可跳过GEOS距离计算
+        if rect:
+            context['boundary_rect'] = rect
+        if self._obs_tree is not None and obstacles is self._obstacles:
+            context['obstacle_tree'] = self._obs_tree
+        return context
+    
     def _analyze_field(self, boundary, obstacles):
         """分析场地特征"""
-        min_x = min(p[0] for p in boundary)
-        max_x = max(p[0] for p in boundary)
-        min_y = min(p[1] for p in boundary)
-        max_y = max(p[1] for p in boundary)
+        min_x, min_y, max_x, max_y = self._bbox(boundary)
         
         field_width = max_x - min_x
         field_height = max_y - min_y
@@ -78,13 +175,13 @@ class SmartGridGenerator:
         # 分析障碍物分布
         obstacle_density = len(obstacles) / ((field_width * field_height) / 1000000)  # 每平方米障碍物数
         
-        # 计算障碍物影响区域
-        blocked_area = 0
-        for obs in obstacles:
-            # 包含安全距离的影响区域
-            influence_width = obs.width + 2 * self.wall_distance
-            influence_height = obs.height + 2 * self.wall_distance
-            blocked_area += influence_width * influence_height
+        # 计算障碍物影响区域（包含安全距离）
+        if obstacles is self._obstacles:
+            infl = self._obs_infl
+        else:
+            wd = self.wall_distance
+            infl = self._to_xyxy(obstacles) + np.array([[-wd, -wd, wd, wd]], dtype=np.float64)
+        blocked_area = float(((infl[:, 2] - infl[:, 0]) * (infl[:, 3] - infl[:, 1])).sum())
         
         blocked_ratio = blocked_area / (field_width * field_height)
         
@@ -129,12 +226,9 @@ class SmartGridGenerator:
         
         return options
     
-    def _create_grid_layout(self, boundary, obstacles, rotation=0):
-        """创建标准网格布局"""
-        min_x = min(p[0] for p in boundary)
-        max_x = max(p[0] for p in boundary)
-        min_y = min(p[1] for p in boundary)
-        max_y = max(p[1] for p in boundary)
+    def _create_grid_layout(self, boundary, obstacles, rotation=0, context=None):
+        """创建标准网格布局（context 为空时根据 boundary 构建）"""
+        min_x, min_y, max_x, max_y = self._bbox(boundary)
         
         # 确定台球桌尺寸
         if rotation == 0:
@@ -181,47 +275,61 @@ class SmartGridGenerator:
         )
         
         # 标记被障碍物阻挡的单元格
-        self._mark_blocked_cells(grid, obstacles)
+        self._mark_blocked_cells(grid, self._obstacle_array(obstacles))
         
         # 生成台球桌布局
+        if context is None:
+            context = self._make_context(boundary, obstacles)
+        
+        # 一次性批量筛选：单元格四角都在场地内且未被障碍物阻挡
+        cells = [cell for row_cells in grid.cells for cell in row_cells]
+        xs = np.array([cell.x for cell in cells], dtype=np.float64)
+        ys = np.array([cell.y for cell in cells], dtype=np.float64)
+        blocked = np.array([cell.blocked for cell in cells], dtype=bool)
+        inside = self._cells_inside(context['boundary_polygon'], xs, ys, table_w, table_h)
+        placeable = inside & ~blocked
+        
+        candidates = [
+            (cell, BilliardTable(cell.x, cell.y, self.table_width, self.table_height, rotation))
+            for cell, ok in zip(cells, placeable) if ok
+        ]
+        
+        # 网格间距按构造满足桌间距离，整体验证一次即可
+        layout = [table for _, table in candidates]
+        valid, _ = self.constraint_solver.validate_layout(layout, context)
+        if valid:
+            for cell, _ in candidates:
+                cell.occupied = True
+            return layout
+        
+        # 整体验证失败（如非矩形场地的墙距），退回逐个验证
         layout = []
-        context = {
-            'boundary': boundary,
-            'boundary_polygon': Polygon(boundary),
-            'obstacles': obstacles
-        }
-        
-        for row in range(rows):
-            for col in range(cols):
-                cell = grid.cells[row][col]
-                if not cell.blocked:
-                    table = BilliardTable(cell.x, cell.y, self.table_width, self.table_height, rotation)
-                    
-                    # 验证约束
-                    temp_layout = layout + [table]
-                    valid, _ = self.constraint_solver.validate_layout(temp_layout, context)
-                    
-                    if valid:
-                        layout.append(table)
-                        cell.occupied = True
+        for cell, table in candidates:
+            valid, _ = self.constraint_solver.try_add(table, layout, context)
+            
+            if valid:
+                layout.append(table)
+                cell.occupied = True
         
         return layout
     
+    def _cells_inside(self, polygon, xs, ys, width, height):
+        """批量判断矩形单元格的四个角是否都在多边形内（含边界）"""
+        corners_x = np.stack([xs, xs + width, xs + width, xs], axis=1).ravel()
+        corners_y = np.stack([ys, ys, ys + height, ys + height], axis=1).ravel()
+        inside = shapely.intersects_xy(polygon, corners_x, corners_y)
+        return inside.reshape(-1, 4).all(axis=1)
+    
     def _create_adaptive_grid(self, boundary, obstacles, analysis):
         """创建自适应网格（根据障碍物调整）"""
         # 根据障碍物位置分割空间
         regions = self._split_by_obstacles(boundary, obstacles)
         
         layout = []
-        context = {
-            'boundary': boundary,
-            'boundary_polygon': Polygon(boundary),
-            'obstacles': obstacles
-        }
         
         for region in regions:
             # 为每个区域选择最佳方向
-            region_layout = self._optimize_region(region, obstacles, context)
+            region_layout = self._optimize_region(region, obstacles)
             layout.extend(region_layout)
         
         return layout
@@ -230,16 +338,13 @@ class SmartGridGenerator:
         """创建密集网格（最大化数量）"""
         layout = []
         
-        min_x = min(p[0] for p in boundary)
-        max_x = max(p[0] for p in boundary)
-        min_y = min(p[1] for p in boundary)
-        max_y = max(p[1] for p in boundary)
+        min_x, min_y, max_x, max_y = self._bbox(boundary)
         
-        context = {
-            'boundary': boundary,
-            'boundary_polygon': Polygon(boundary),
-            'obstacles': obstacles
-        }
+        context = self._make_context(boundary, obstacles)
+        
+        # 已放置台球桌的网格索引，候选位置只与邻近的台球桌比较
+        table_index = UniformGridIndex(max(self.table_width, self.table_height) + self.table_distance)
+        context['table_index'] = table_index
         
         # 使用更小的扫描步长
         scan_step = 50
@@ -255,21 +360,25 @@ class SmartGridGenerator:
                 step_w = self.table_height + self.table_distance
                 step_h = self.table_width + self.table_distance
             
-            # 规则网格位置
-            y = min_y + self.wall_distance
-            while y + table_h <= max_y - self.wall_distance:
-                x = min_x + self.wall_distance
-                while x + table_w <= max_x - self.wall_distance:
-                    table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
-                    temp_layout = layout + [table]
-                    valid, _ = self.constraint_solver.validate_layout(temp_layout, context)
-                    
-                    if valid:
-                        layout.append(table)
-                        x += step_w
-                    else:
-                        x += scan_step
-                y += step_h
+            # 规则网格位置：行坐标等距，行内从上一张桌子之后按扫描步长前进
+            x_start = min_x + self.wall_distance
+            x_limit = max_x - self.wall_distance - table_w
+            y_limit = max_y - self.wall_distance - table_h
+            
+            for y in self._lattice(min_y + self.wall_distance, y_limit, step_h):
+                scan_from = x_start
+                while scan_from is not None:
+                    next_from = None
+                    for x in self._lattice(scan_from, x_limit, scan_step):
+                        table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
+                        valid, _ = self.constraint_solver.try_add(table, layout, context)
+                        
+                        if valid:
+                            table_index.insert(len(layout), table)
+                            layout.append(table)
+                            next_from = x + step_w
+                            break
+                    scan_from = next_from
         
         # 填充剩余空隙
         for y in range(int(min_y + self.wall_distance), 
@@ -288,30 +397,42 @@ class SmartGridGenerator:
                         continue
                     
                     table = BilliardTable(x, y, self.table_width, self.table_height, rotation)
-                    temp_layout = layout + [table]
-                    valid, _ = self.constraint_solver.validate_layout(temp_layout, context)
+                    valid, _ = self.constraint_solver.try_add(table, layout, context)
                     
                     if valid:
+                        table_index.insert(len(layout), table)
                         layout.append(table)
                         break
         
         return layout
     
-    def _mark_blocked_cells(self, grid, obstacles):
+    def _lattice(self, start, stop, step):
+        """从start开始、步长为step、不超过stop的等距坐标"""
+        if stop < start:
+            return []
+        count = int((stop - start) // step) + 1
+        return (start + step * np.arange(count)).tolist()
+    
+    def _mark_blocked_cells(self, grid, obs_xyxy):
         """标记被障碍物阻挡的网格单元"""
-        for row in range(grid.rows):
-            for col in range(grid.cols):
-                cell = grid.cells[row][col]
-                
-                # 检查是否与任何障碍物冲突
-                cell_rect = Rectangle(cell.x, cell.y, cell.width, cell.height)
-                
-                for obstacle in obstacles:
-                    # 计算距离（包含安全距离）
-                    distance = cell_rect.distance_to(obstacle)
-                    if distance < self.wall_distance:
-                        cell.blocked = True
-                        break
+        if len(obs_xyxy) == 0:
+            return
+        
+        cells = [cell for row_cells in grid.cells for cell in row_cells]
+        cell_xyxy = np.array([[c.x, c.y, c.x + c.width, c.y + c.height] for c in cells],
+                             dtype=np.float64)
+        
+        # 单元格与障碍物两两之间的轴向间隙 (N, O)，无分支计算
+        dx = np.maximum(0, np.maximum(obs_xyxy[None, :, 0] - cell_xyxy[:, None, 2],
+                                      cell_xyxy[:, None, 0] - obs_xyxy[None, :, 2]))
+        dy = np.maximum(0, np.maximum(obs_xyxy[None, :, 1] - cell_xyxy[:, None, 3],
+                                      cell_xyxy[:, None, 1] - obs_xyxy[None, :, 3]))
+        
+        # 比较距离平方，省去开方（包含安全距离）
+        blocked = (dx * dx + dy * dy < self.wall_distance * self.wall_distance).any(axis=1)
+        for cell, is_blocked in zip(cells, blocked):
+            if is_blocked:
+                cell.blocked = True
     
     def _split_by_obstacles(self, boundary, obstacles):
         """根据障碍物分割空间"""
@@ -319,19 +440,17 @@ class SmartGridGenerator:
             return [boundary]
         
         # 简化实现：创建主要区域
-        min_x = min(p[0] for p in boundary)
-        max_x = max(p[0] for p in boundary)
-        min_y = min(p[1] for p in boundary)
-        max_y = max(p[1] for p in boundary)
+        min_x, min_y, max_x, max_y = self._bbox(boundary)
         
         regions = []
         
-        # 根据障碍物位置创建区域
-        obstacle_y_positions = sorted(set(obs.y for obs in obstacles))
+        # 根据障碍物位置创建区域（np.unique 返回已排序的去重坐标）
+        obs_xyxy = self._obstacle_array(obstacles)
+        obstacle_y_positions = np.unique(obs_xyxy[:, 1])
         
-        if obstacle_y_positions:
+        if obstacle_y_positions.size:
             # 上方区域
-            top_y = min(obstacle_y_positions) - self.wall_distance
+            top_y = float(obstacle_y_positions[0]) - self.wall_distance
             if top_y > min_y + self.wall_distance + self.table_height:
                 regions.append([
                     [min_x, min_y], [max_x, min_y], 
@@ -339,7 +458,7 @@ class SmartGridGenerator:
                 ])
             
             # 下方区域
-            bottom_y = max(obs.y + obs.height for obs in obstacles) + self.wall_distance
+            bottom_y = float(obs_xyxy[:, 3].max()) + self.wall_distance
             if bottom_y < max_y - self.wall_distance - self.table_height:
                 regions.append([
                     [min_x, bottom_y], [max_x, bottom_y], 
@@ -351,13 +470,10 @@ class SmartGridGenerator:
         
         return regions
     
-    def _optimize_region(self, region, obstacles, context):
+    def _optimize_region(self, region, obstacles):
         """优化单个区域的布局"""
         # 计算区域尺寸
-        min_x = min(p[0] for p in region)
-        max_x = max(p[0] for p in region)
-        min_y = min(p[1] for p in region)
-        max_y = max(p[1] for p in region)
+        min_x, min_y, max_x, max_y = self._bbox(region)
         
         region_width = max_x - min_x
         region_height = max_y - min_y
@@ -368,14 +484,10 @@ class SmartGridGenerator:
         
         rotation = 0 if h_capacity >= v_capacity else 90
         
-        # 在区域内创建网格
-        region_context = {
-            'boundary': region,
-            'boundary_polygon': Polygon(region),
-            'obstacles': obstacles
-        }
+        # 在区域内创建网格，区域多边形只构建一次
+        region_context = self._make_context(region, obstacles)
         
-        return self._create_grid_layout(region, obstacles, rotation)
+        return self._create_grid_layout(region, obstacles, rotation, region_context)
     
     def _estimate_capacity(self, width, height, rotation):
         """估算容量"""
@@ -384,32 +496,45 @@ class SmartGridGenerator:
         else:
             table_w, table_h = self.table_height, self.table_width
         
-        cols = int((width - 2 * self.wall_distance + self.table_distance) / (table_w + self.table_distance))
-        rows = int((height - 2 * self.wall_distance + self.table_distance) / (table_h + self.table_distance))
-        
-        return max(0, cols * rows)
+        return _grid_capacity(width, height, table_w, table_h,
+                              self.wall_distance, self.table_distance)
     
     def _select_best_grid(self, options, boundary, obstacles):
         """选择最佳网格方案"""
         if not options:
             return []
         
-        best_layout = []
+        best_index = None
         best_score = 0
+        scores = [None] * len(options)
         
-        for option_name, layout in options:
+        # 按数量从多到少评分：数量差距超过质量分上限的方案不可能胜出，跳过质量计算
+        order = sorted(range(len(options)), key=lambda i: -len(options[i][1]))
+        for i in order:
+            layout = options[i][1]
+            
             # 计算评分：数量 + 质量
             count_score = len(layout) * 10
+            if count_score + MAX_QUALITY_SCORE < best_score:
+                continue
+            
             quality_score = self._calculate_quality_score(layout, boundary)
             total_score = count_score + quality_score
+            scores[i] = total_score
             
-            print(f"  {option_name}: {len(layout)}个桌子, 评分: {total_score:.1f}")
-            
-            if total_score > best_score:
-                best_layout = layout
+            # 同分时保留原顺序中靠前的方案
+            if total_score > best_score or (total_score == best_score and best_index is not None
+                                            and i < best_index):
+                best_index = i
                 best_score = total_score
         
-        return best_layout
+        for (option_name, layout), total_score in zip(options, scores):
+            if total_score is None:
+                print(f"  {option_name}: {len(layout)}个桌子, 评分: 未计算（数量不足）")
+            else:
+                print(f"  {option_name}: {len(layout)}个桌子, 评分: {total_score:.1f}")
+        
+        return options[best_index][1] if best_index is not None else []
     
     def _calculate_quality_score(self, layout, boundary):
         """计算布局质量评分"""
@@ -436,16 +561,10 @@ class SmartGridGenerator:
             return 10
         
         # 计算位置间距的一致性
-        sorted_pos = sorted(positions)
-        gaps = [sorted_pos[i+1] - sorted_pos[i] for i in range(len(sorted_pos)-1)]
-        
-        if not gaps:
-            return 10
+        gaps = np.diff(np.sort(np.asarray(positions, dtype=np.float64)))
         
         # 计算间距的标准差
-        mean_gap = sum(gaps) / len(gaps)
-        variance = sum((gap - mean_gap) ** 2 for gap in gaps) / len(gaps)
-        std_dev = variance ** 0.5
+        std_dev = float(gaps.std())
         
         # 标准差越小，规则性越高
         regularity = max(0, 10 - std_dev / 100)
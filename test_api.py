@@ -3,60 +3,79 @@ API测试脚本
 """
 
 import requests
+from concurrent.futures import ThreadPoolExecutor
 import json
 import time
 
+from api_client import get_session, loads
 
-def test_health():
-    """测试健康检查端点"""
+
+BASE_URL = 'http://localhost:8080'
+
+
+def request_health():
+    """请求健康检查端点"""
+    return get_session().get(f'{BASE_URL}/api/health')
+
+
+def _report_health(response):
+    """输出健康检查结果"""
     print("测试健康检查...")
-    response = requests.get('http://localhost:8080/api/health')
     print(f"状态码: {response.status_code}")
-    print(f"响应: {response.json()}")
+    print(f"响应: {loads(response.content)}")
     print()
 
 
-def test_optimize():
-    """测试布局优化"""
-    print("测试布局优化...")
-    
-    # 测试数据：10m x 15m的场地，带两个柱子
-    data = {
-        "boundary": [
-            [0, 0],
-            [10000, 0],
-            [10000, 15000],
-            [0, 15000]
-        ],
-        "obstacles": [
-            {
-                "type": "rectangle",
-                "center": [3000, 5000],
-                "size": [400, 400]
-            },
-            {
-                "type": "rectangle", 
-                "center": [7000, 10000],
-                "size": [400, 400]
-            }
-        ],
-        "config": {
-            "wall_distance": 1500,
-            "table_distance": 1400,
-            "table_width": 2850,
-            "table_height": 1550,
-            "grid_size": 200
+def test_health():
+    """测试健康检查端点"""
+    _report_health(request_health())
+
+
+# 测试数据：10m x 15m的场地，带两个柱子
+OPTIMIZE_DATA = {
+    "boundary": [
+        [0, 0],
+        [10000, 0],
+        [10000, 15000],
+        [0, 15000]
+    ],
+    "obstacles": [
+        {
+            "type": "rectangle",
+            "center": [3000, 5000],
+            "size": [400, 400]
+        },
+        {
+            "type": "rectangle", 
+            "center": [7000, 10000],
+            "size": [400, 400]
         }
+    ],
+    "config": {
+        "wall_distance": 1500,
+        "table_distance": 1400,
+        "table_width": 2850,
+        "table_height": 1550,
+        "grid_size": 200
     }
-    
-    response = requests.post(
-        'http://localhost:8080/api/layout/optimize',
-        json=data,
+}
+
+
+def request_optimize():
+    """请求布局优化"""
+    return get_session().post(
+        f'{BASE_URL}/api/layout/optimize',
+        json=OPTIMIZE_DATA,
         headers={'Content-Type': 'application/json'}
     )
+
+
+def _report_optimize(response):
+    """输出布局优化结果"""
+    print("测试布局优化...")
     
     print(f"状态码: {response.status_code}")
-    result = response.json()
+    result = loads(response.content)
     
     if result.get('success'):
         print(f"成功！放置了 {result['count']} 个台球桌")
@@ -70,36 +89,45 @@ def test_optimize():
     print()
 
 
-def test_validate():
-    """测试布局验证"""
-    print("测试布局验证...")
-    
-    # 测试数据：一个可能违反约束的布局
-    data = {
-        "boundary": [
-            [0, 0],
-            [10000, 0],
-            [10000, 10000],
-            [0, 10000]
-        ],
-        "tables": [
-            {"x": 100, "y": 100, "width": 2850, "height": 1550, "rotation": 0},  # 太靠近墙壁
-            {"x": 5000, "y": 5000, "width": 2850, "height": 1550, "rotation": 0}
-        ],
-        "config": {
-            "wall_distance": 1500,
-            "table_distance": 1400
-        }
+def test_optimize():
+    """测试布局优化"""
+    _report_optimize(request_optimize())
+
+
+# 测试数据：一个可能违反约束的布局
+VALIDATE_DATA = {
+    "boundary": [
+        [0, 0],
+        [10000, 0],
+        [10000, 10000],
+        [0, 10000]
+    ],
+    "tables": [
+        {"x": 100, "y": 100, "width": 2850, "height": 1550, "rotation": 0},  # 太靠近墙壁
+        {"x": 5000, "y": 5000, "width": 2850, "height": 1550, "rotation": 0}
+    ],
+    "config": {
+        "wall_distance": 1500,
+        "table_distance": 1400
     }
-    
-    response = requests.post(
-        'http://localhost:8080/api/layout/validate',
-        json=data,
+}
+
+
+def request_validate():
+    """请求布局验证"""
+    return get_session().post(
+        f'{BASE_URL}/api/layout/validate',
+        json=VALIDATE_DATA,
         headers={'Content-Type': 'application/json'}
     )
+
+
+def _report_validate(response):
+    """输出布局验证结果"""
+    print("测试布局验证...")
     
     print(f"状态码: {response.status_code}")
-    result = response.json()
+    result = loads(response.content)
     
     if result.get('success'):
         print(f"验证{'通过' if result['valid'] else '失败'}")
@@ -112,12 +140,21 @@ def test_validate():
     print()
 
 
-def test_test_endpoint():
-    """测试示例数据端点"""
+def test_validate():
+    """测试布局验证"""
+    _report_validate(request_validate())
+
+
+def request_test_endpoint():
+    """请求示例数据端点"""
+    return get_session().get(f'{BASE_URL}/api/layout/test')
+
+
+def _report_test_endpoint(response):
+    """输出示例数据端点的结果"""
     print("测试示例数据端点...")
-    response = requests.get('http://localhost:8080/api/layout/test')
     print(f"状态码: {response.status_code}")
-    result = response.json()
+    result = loads(response.content)
     
     if result.get('success'):
         print(f"成功！放置了 {result['count']} 个台球桌")
@@ -126,6 +163,11 @@ def test_test_endpoint():
         print(f"失败: {result.get('error')}")
 
 
+def test_test_endpoint():
+    """测试示例数据端点"""
+    _report_test_endpoint(request_test_endpoint())
+
+
 if __name__ == '__main__':
     print("开始API测试...\n")
     
@@ -135,10 +177,17 @@ if __name__ == '__main__':
     input()
     
     try:
-        test_health()
-        test_optimize()
-        test_validate()
-        test_test_endpoint()
+        # 各端点请求并发发送，结果按顺序输出
+        tests = [
+            (request_health, _report_health),
+            (request_optimize, _report_optimize),
+            (request_validate, _report_validate),
+            (request_test_endpoint, _report_test_endpoint),
+        ]
+        with ThreadPoolExecutor(len(tests)) as executor:
+            futures = [executor.submit(request) for request, _ in tests]
+        for (_, report), future in zip(tests, futures):
+            report(future.result())
         print("所有测试完成！")
     except requests.exceptions.ConnectionError:
         print("错误：无法连接到服务器。请确保Flask服务器正在运行。")
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """测试优化API"""
 
-import requests
 import json
 
+from api_client import post_json
+
 # API端点
 url = "http://127.0.0.1:8080/api/layout/optimize"
 
@@ -37,8 +38,7 @@ data = {
 }
 
 # 发送请求
-response = requests.post(url, json=data)
-result = response.json()
+result = post_json(url, data)
 
 if result['success']:
     print(f"优化成功！放置了 {result['count']} 个台球桌")
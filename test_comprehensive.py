@@ -4,41 +4,53 @@
 """
 
 import requests
-import json
+from concurrent.futures import ThreadPoolExecutor
+
+from api_client import post_json
 
 # API端点
 API_URL = "http://127.0.0.1:8080/api/layout/optimize"
 
-def test_layout(name, test_data):
-    """测试单个布局"""
+def request_layout(test_data):
+    """发送布局请求，返回解析后的结果；请求失败时返回异常"""
+    try:
+        return post_json(API_URL, test_data)
+    except Exception as e:
+        return e
+
+def _report_layout(name, result):
+    """输出单个场景的结果，result为 request_layout 的返回值"""
     print(f"\n{'='*60}")
     print(f"测试场景: {name}")
     print(f"{'='*60}")
     
     try:
-        response = requests.post(API_URL, json=test_data)
+        if isinstance(result, Exception):
+            raise result
         
-        if response.status_code == 200:
-            result = response.json()
-            if result['success']:
-                print(f"✅ 布局优化成功!")
-                print(f"   放置了 {result['count']} 个台球桌")
-                print(f"   空间利用率: {result['stats']['space_utilization']}%")
-                print(f"   平均间距: {result['stats']['average_distance']:.0f}mm")
-                
-                print(f"\n📍 台球桌位置:")
-                for i, table in enumerate(result['tables']):
-                    print(f"   台球桌 #{i+1}: 位置({table['x']:.0f}, {table['y']:.0f}), " +
-                          f"尺寸({table['width']:.0f}x{table['height']:.0f}), " +
-                          f"旋转: {table['rotation']}°")
-            else:
-                print(f"❌ 优化失败: {result.get('error', '未知错误')}")
+        if result['success']:
+            print(f"✅ 布局优化成功!")
+            print(f"   放置了 {result['count']} 个台球桌")
+            print(f"   空间利用率: {result['stats']['space_utilization']}%")
+            print(f"   平均间距: {result['stats']['average_distance']:.0f}mm")
+            
+            print(f"\n📍 台球桌位置:")
+            for i, table in enumerate(result['tables']):
+                print(f"   台球桌 #{i+1}: 位置({table['x']:.0f}, {table['y']:.0f}), " +
+                      f"尺寸({table['width']:.0f}x{table['height']:.0f}), " +
+                      f"旋转: {table['rotation']}°")
         else:
-            print(f"❌ HTTP错误: {response.status_code}")
+            print(f"❌ 优化失败: {result.get('error', '未知错误')}")
             
+    except requests.HTTPError as e:
+        print(f"❌ HTTP错误: {e.response.status_code}")
     except Exception as e:
         print(f"❌ 错误: {str(e)}")
 
+def test_layout(name, test_data):
+    """测试单个布局"""
+    _report_layout(name, request_layout(test_data))
+
 # 测试1: 小型场地（7x10米），无障碍物
 test1 = {
     "boundary": [[0, 0], [7000, 0], [7000, 10000], [0, 10000]],
@@ -103,11 +115,17 @@ test4 = {
     }
 }
 
-# 执行所有测试
-test_layout("小型场地（7x10米）无障碍物", test1)
-test_layout("中型场地（10x15米）有障碍物", test2)
-test_layout("大型场地（15x20米）多障碍物", test3)
-test_layout("L形不规则场地", test4)
+# 执行所有测试：四个请求并发发送（每个线程使用各自的会话），结果按场景顺序输出
+tests = [
+    ("小型场地（7x10米）无障碍物", test1),
+    ("中型场地（10x15米）有障碍物", test2),
+    ("大型场地（15x20米）多障碍物", test3),
+    ("L形不规则场地", test4),
+]
+with ThreadPoolExecutor(len(tests)) as executor:
+    futures = [executor.submit(request_layout, data) for _, data in tests]
+for (name, _), future in zip(tests, futures):
+    _report_layout(name, future.result())
 
 print(f"\n{'='*60}")
 print("测试完成！")
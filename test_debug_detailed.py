@@ -7,7 +7,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from core import Rectangle, BilliardTable
+import numpy as np
+from core import Rectangle
+from core.constraints import candidates_vs_obstacles, gap_squared
 from core.regular_layout import RegularLayoutGenerator
 
 def test_grid_placement():
@@ -37,29 +39,28 @@ def test_grid_placement():
     # 测试第二列的各个y位置
     y_positions = [1500, 4450, 6750, 9700, 12650]
     
-    for y in y_positions:
+    # 一次计算所有候选位置到所有障碍物的距离 (候选数, 障碍物数)
+    ys = np.array(y_positions, dtype=np.float64)
+    cands = np.stack([np.full_like(ys, x_col2), ys,
+                      np.full_like(ys, x_col2 + table_width), ys + table_height], axis=-1)
+    obs = Rectangle.stack(obstacles)
+    dist = np.sqrt(gap_squared(cands[:, None], obs[None, :]))
+    feasible = candidates_vs_obstacles(cands, obs, 1500)
+    
+    for k, y in enumerate(y_positions):
         if y + table_height > 13500:
             print(f"\ny={y}: 超出边界")
             continue
-            
-        table = BilliardTable(x_col2, y, table_width, table_height, 0)
-        table_bounds = table.get_bounds()
         
         print(f"\ny={y}:")
-        print(f"  台球桌范围: ({table_bounds.x}, {table_bounds.y}) - ({table_bounds.x + table_bounds.width}, {table_bounds.y + table_bounds.height})")
+        print(f"  台球桌范围: ({x_col2}, {y}) - ({x_col2 + table_width}, {y + table_height})")
         
-        # 检查与障碍物的距离
-        valid = True
-        for i, obs in enumerate(obstacles):
-            dist = table_bounds.distance_to(obs)
-            print(f"  距离障碍物{i+1}: {dist:.0f}mm", end="")
-            if dist < 1500:
-                print(" -> 冲突!")
-                valid = False
-            else:
-                print(" -> OK")
+        # 与障碍物的距离
+        for i in range(len(obstacles)):
+            print(f"  距离障碍物{i+1}: {dist[k, i]:.0f}mm", end="")
+            print(" -> 冲突!" if dist[k, i] < 1500 else " -> OK")
         
-        if valid:
+        if feasible[k]:
             print(f"  -> 可以放置!")
     
     # 运行实际的布局算法看看结果
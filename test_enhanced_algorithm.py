@@ -5,14 +5,33 @@
 
 import sys
 import os
+from collections import Counter
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from core.enhanced_layout import EnhancedLayoutGenerator
 from core.optimized_layout import OptimizedLayoutGenerator
 from core.regular_layout import RegularLayoutGenerator
 from core.maxrects import Rectangle
+import contextlib
+import functools
+import io
+import multiprocessing
 import time
 
+def buffered_output(func):
+    """测试运行期间的输出（包括生成器的输出）先写入缓冲区，结束后一次性写到stdout"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        buffer = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buffer):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buffer.getvalue())
+            sys.stdout.flush()
+    return wrapper
+
+@buffered_output
 def test_enhanced_vs_original():
     """对比增强算法与原算法"""
     print("=" * 60)
@@ -30,7 +49,8 @@ def test_enhanced_vs_original():
         'wall_distance': 1500,
         'table_distance': 1400,
         'table_width': 2850,
-        'table_height': 1550
+        'table_height': 1550,
+        'use_layout_cache': False  # 计时对比，不复用缓存结果
     }
     
     print(f"测试场地: 10m x 15m")
@@ -40,9 +60,9 @@ def test_enhanced_vs_original():
     # 1. 测试规则布局（基准）
     print("\n1. 规则布局算法（基准）:")
     regular_gen = RegularLayoutGenerator(config)
-    start_time = time.time()
+    start_time = time.perf_counter()
     regular_layout = regular_gen.generate_layout(boundary, obstacles)
-    regular_time = time.time() - start_time
+    regular_time = time.perf_counter() - start_time
     
     print(f"   结果: {len(regular_layout)} 个台球桌")
     print(f"   用时: {regular_time:.2f} 秒")
@@ -50,9 +70,9 @@ def test_enhanced_vs_original():
     # 2. 测试原优化算法
     print("\n2. 原优化算法:")
     opt_gen = OptimizedLayoutGenerator(config)
-    start_time = time.time()
+    start_time = time.perf_counter()
     opt_layout = opt_gen.generate_layout(boundary, obstacles)
-    opt_time = time.time() - start_time
+    opt_time = time.perf_counter() - start_time
     
     print(f"   结果: {len(opt_layout)} 个台球桌")
     print(f"   用时: {opt_time:.2f} 秒")
@@ -61,9 +81,9 @@ def test_enhanced_vs_original():
     # 3. 测试增强算法
     print("\n3. 增强算法:")
     enhanced_gen = EnhancedLayoutGenerator(config)
-    start_time = time.time()
+    start_time = time.perf_counter()
     enhanced_layout = enhanced_gen.generate_layout(boundary, obstacles)
-    enhanced_time = time.time() - start_time
+    enhanced_time = time.perf_counter() - start_time
     
     print(f"   结果: {len(enhanced_layout)} 个台球桌")
     print(f"   用时: {enhanced_time:.2f} 秒")
@@ -82,8 +102,8 @@ def test_enhanced_vs_original():
             print(f"     台球桌{i+1}: ({table.x:.0f}, {table.y:.0f}) - {orientation}")
         
         # 分析布局质量
-        horizontal_count = sum(1 for t in best_layout if t.rotation == 0)
-        vertical_count = sum(1 for t in best_layout if t.rotation == 90)
+        rotations = Counter(t.rotation for t in best_layout)
+        horizontal_count, vertical_count = rotations[0], rotations[90]
         print(f"\n   布局统计:")
         print(f"     横向: {horizontal_count} 个")
         print(f"     纵向: {vertical_count} 个")
@@ -102,6 +122,27 @@ def test_enhanced_vs_original():
     
     return regular_layout, opt_layout, enhanced_layout
 
+def _run_scenario(args):
+    """在子进程中运行单个场景，返回 (输出日志, 结果)"""
+    scenario, config = args
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        # 测试增强算法
+        enhanced_gen = EnhancedLayoutGenerator(config)
+        enhanced_layout = enhanced_gen.generate_layout(scenario['boundary'], scenario['obstacles'])
+        
+        # 测试原算法
+        opt_gen = OptimizedLayoutGenerator(config)
+        opt_layout = opt_gen.generate_layout(scenario['boundary'], scenario['obstacles'])
+    
+    return buffer.getvalue(), {
+        'scenario': scenario['name'],
+        'original': len(opt_layout),
+        'enhanced': len(enhanced_layout),
+        'improvement': len(enhanced_layout) - len(opt_layout)
+    }
+
+@buffered_output
 def test_multiple_scenarios():
     """测试多种场景"""
     print("\n" + "=" * 60)
@@ -137,32 +178,21 @@ def test_multiple_scenarios():
         'table_height': 1550
     }
     
-    results = []
+    # 各场景相互独立，并行运行；每个场景的输出先缓存，再按顺序打印
+    with multiprocessing.Pool(len(scenarios)) as pool:
+        outputs = pool.map(_run_scenario, [(scenario, config) for scenario in scenarios])
     
-    for scenario in scenarios:
+    results = []
+    for scenario, (log, result) in zip(scenarios, outputs):
         print(f"\n场景: {scenario['name']}")
         print("-" * 30)
+        print(log, end="")
         
-        # 测试增强算法
-        enhanced_gen = EnhancedLayoutGenerator(config)
-        enhanced_layout = enhanced_gen.generate_layout(scenario['boundary'], scenario['obstacles'])
-        
-        # 测试原算法
-        opt_gen = OptimizedLayoutGenerator(config)
-        opt_layout = opt_gen.generate_layout(scenario['boundary'], scenario['obstacles'])
-        
-        improvement = len(enhanced_layout) - len(opt_layout)
-        
-        print(f"原算法: {len(opt_layout)} 个台球桌")
-        print(f"增强算法: {len(enhanced_layout)} 个台球桌")
-        print(f"改进: {improvement:+d} 个")
+        print(f"原算法: {result['original']} 个台球桌")
+        print(f"增强算法: {result['enhanced']} 个台球桌")
+        print(f"改进: {result['improvement']:+d} 个")
         
-        results.append({
-            'scenario': scenario['name'],
-            'original': len(opt_layout),
-            'enhanced': len(enhanced_layout),
-            'improvement': improvement
-        })
+        results.append(result)
     
     # 总结
     print(f"\n总结:")
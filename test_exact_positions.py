@@ -3,6 +3,12 @@
 测试精确位置
 """
 
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.constraints import grid_positions
+
 # 场地参数
 field_width = 10000
 field_height = 15000
@@ -23,13 +29,13 @@ print(f"台球桌宽度: {table_width}")
 print(f"台球桌间距: {table_distance}")
 
 print("\n列位置计算:")
-x = usable_start_x
-col = 1
-while x + table_width <= usable_end_x:
+column_step = table_width + table_distance
+column_xs = grid_positions(usable_start_x, usable_end_x, table_width, column_step)
+for col, x in enumerate(column_xs, 1):
     print(f"第{col}列: x = {x} 到 {x + table_width}")
-    x = x + table_width + table_distance
-    col += 1
-    
+
+col = len(column_xs) + 1
+x = usable_start_x + column_step * len(column_xs)
 print(f"\n下一列起始位置: x = {x}")
 if x + table_width > usable_end_x:
     print(f"第{col}列无法放置 (需要到 {x + table_width}, 但边界是 {usable_end_x})")
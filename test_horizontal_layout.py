@@ -6,6 +6,8 @@
 import requests
 import json
 
+from api_client import post_json
+
 # API端点
 API_URL = "http://127.0.0.1:8080/api/layout/optimize"
 
@@ -42,28 +44,26 @@ test_data = {
 
 try:
     # 发送请求
-    response = requests.post(API_URL, json=test_data)
+    result = post_json(API_URL, test_data)
     
-    if response.status_code == 200:
-        result = response.json()
-        if result['success']:
-            print(f"✅ 横向布局优化成功!")
-            print(f"   放置了 {result['count']} 个台球桌")
-            print(f"   优化用时: {result['optimization_time']:.2f} 秒")
-            print(f"\n📊 统计信息:")
-            for key, value in result['stats'].items():
-                print(f"   {key}: {value}")
-            
-            print(f"\n📍 台球桌位置:")
-            for i, table in enumerate(result['tables']):
-                print(f"   台球桌 #{i+1}: 位置({table['x']:.0f}, {table['y']:.0f}), " +
-                      f"旋转: {table['rotation']}°")
-        else:
-            print(f"❌ 优化失败: {result.get('error', '未知错误')}")
+    if result['success']:
+        print(f"✅ 横向布局优化成功!")
+        print(f"   放置了 {result['count']} 个台球桌")
+        print(f"   优化用时: {result['optimization_time']:.2f} 秒")
+        print(f"\n📊 统计信息:")
+        for key, value in result['stats'].items():
+            print(f"   {key}: {value}")
+        
+        print(f"\n📍 台球桌位置:")
+        for i, table in enumerate(result['tables']):
+            print(f"   台球桌 #{i+1}: 位置({table['x']:.0f}, {table['y']:.0f}), " +
+                  f"旋转: {table['rotation']}°")
     else:
-        print(f"❌ HTTP错误: {response.status_code}")
-        print(response.text)
+        print(f"❌ 优化失败: {result.get('error', '未知错误')}")
         
+except requests.HTTPError as e:
+    print(f"❌ HTTP错误: {e.response.status_code}")
+    print(e.response.text)
 except requests.exceptions.ConnectionError:
     print("❌ 无法连接到服务器，请确保服务器正在运行")
 except Exception as e:
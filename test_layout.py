@@ -7,6 +7,7 @@ from core.optimized_layout import OptimizedLayoutGenerator
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.patches import Rectangle as RectPatch
+from matplotlib.collections import PatchCollection
 
 def visualize_layout(boundary, obstacles, tables, title="Layout Visualization"):
     """可视化布局结果"""
@@ -15,39 +16,44 @@ def visualize_layout(boundary, obstacles, tables, title="Layout Visualization"):
     # 绘制边界
     boundary_x = [p[0] for p in boundary] + [boundary[0][0]]
     boundary_y = [p[1] for p in boundary] + [boundary[0][1]]
-    ax.plot(boundary_x, boundary_y, 'k-', linewidth=2, label='Boundary')
+    boundary_line, = ax.plot(boundary_x, boundary_y, 'k-', linewidth=2, label='Boundary')
+    legend_handles = [boundary_line]
     
-    # 绘制障碍物
-    for i, obs in enumerate(obstacles):
-        rect = RectPatch((obs.x, obs.y), obs.width, obs.height, 
-                         linewidth=1, edgecolor='red', facecolor='lightcoral', 
-                         label='Obstacle' if i == 0 else '')
-        ax.add_patch(rect)
+    # 绘制障碍物（一次性添加为一个集合）
+    obs_style = dict(linewidth=1, edgecolor='red', facecolor='lightcoral')
+    obs_patches = [RectPatch((obs.x, obs.y), obs.width, obs.height, **obs_style)
+                   for obs in obstacles]
+    if obs_patches:
+        ax.add_collection(PatchCollection(obs_patches, match_original=True))
+        legend_handles.append(patches.Patch(label='Obstacle', **obs_style))
     
     # 绘制台球桌
+    table_style = dict(linewidth=1, edgecolor='green', facecolor='lightgreen')
+    table_patches = []
     for i, table in enumerate(tables):
         # 获取实际尺寸（考虑旋转）
         if table.rotation == 0:
             width, height = table.width, table.height
         else:
             width, height = table.height, table.width
-            
-        rect = RectPatch((table.x, table.y), width, height,
-                         linewidth=1, edgecolor='green', facecolor='lightgreen',
-                         label='Table' if i == 0 else '')
-        ax.add_patch(rect)
+        
+        table_patches.append(RectPatch((table.x, table.y), width, height, **table_style))
         
         # 添加编号
         center_x = table.x + width / 2
         center_y = table.y + height / 2
         ax.text(center_x, center_y, str(i+1), ha='center', va='center', fontsize=12, fontweight='bold')
     
+    if table_patches:
+        ax.add_collection(PatchCollection(table_patches, match_original=True))
+        legend_handles.append(patches.Patch(label='Table', **table_style))
+    
     # 设置坐标轴
     ax.set_xlim(-500, 10500)
     ax.set_ylim(-500, 15500)
     ax.set_aspect('equal')
     ax.grid(True, alpha=0.3)
-    ax.legend()
+    ax.legend(handles=legend_handles)
     ax.set_title(f"{title} - {len(tables)} tables")
     
     # 添加尺寸标注
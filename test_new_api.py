@@ -6,8 +6,10 @@
 import requests
 import json
 
-# API端点
-url = "http://127.0.0.1:8080/api/layout/optimize"
+from api_client import get_session, loads, post_json
+
+# API端点（批量优化接口，一次请求计算多个用例）
+batch_url = "http://127.0.0.1:8080/api/layout/optimize/batch"
 
 def test_enhanced_api():
     """测试增强API"""
@@ -79,47 +81,47 @@ def test_enhanced_api():
         }
     ]
     
-    results = []
+    # 按用例名称保存结果，对比时直接按名称取出
+    results = {}
+    
+    # 所有用例放在一个批量请求中发送，服务端并行求解，results 按用例顺序返回
+    try:
+        batch = post_json(batch_url, {'cases': [tc['data'] for tc in test_cases]}, timeout=120)
+    except requests.exceptions.ConnectionError:
+        print("❌ 无法连接到服务器，请确保服务器正在运行")
+        return
+    except requests.HTTPError as e:
+        print(f"❌ HTTP错误: {e.response.status_code}")
+        return
     
-    for test_case in test_cases:
+    for test_case, result in zip(test_cases, batch['results']):
         print(f"\n{test_case['name']}:")
         print("-" * 30)
         
         try:
-            # 发送请求
-            response = requests.post(url, json=test_case['data'])
-            
-            if response.status_code == 200:
-                result = response.json()
-                if result['success']:
-                    print(f"✅ 成功！")
-                    print(f"   台球桌数量: {result['count']} 个")
-                    print(f"   使用算法: {result.get('algorithm', 'unknown')}")
-                    print(f"   空间利用率: {result['stats']['space_utilization']}%")
-                    print(f"   平均间距: {result['stats']['average_distance']:.0f}mm")
-                    
-                    print(f"\n   台球桌位置:")
-                    for i, table in enumerate(result['tables'][:5]):  # 只显示前5个
-                        orientation = "横向" if table['rotation'] == 0 else "纵向"
-                        print(f"     #{i+1}: ({table['x']:.0f}, {table['y']:.0f}) - {orientation}")
-                    
-                    if len(result['tables']) > 5:
-                        print(f"     ... 还有 {len(result['tables']) - 5} 个台球桌")
-                    
-                    results.append({
-                        'name': test_case['name'],
-                        'count': result['count'],
-                        'algorithm': result.get('algorithm', 'unknown'),
-                        'utilization': result['stats']['space_utilization']
-                    })
-                else:
-                    print(f"❌ 失败: {result.get('error', '未知错误')}")
+            if result['success']:
+                print(f"✅ 成功！")
+                print(f"   台球桌数量: {result['count']} 个")
+                print(f"   使用算法: {result.get('algorithm', 'unknown')}")
+                print(f"   空间利用率: {result['stats']['space_utilization']}%")
+                print(f"   平均间距: {result['stats']['average_distance']:.0f}mm")
+                
+                print(f"\n   台球桌位置:")
+                for i, table in enumerate(result['tables'][:5]):  # 只显示前5个
+                    orientation = "横向" if table['rotation'] == 0 else "纵向"
+                    print(f"     #{i+1}: ({table['x']:.0f}, {table['y']:.0f}) - {orientation}")
+                
+                if len(result['tables']) > 5:
+                    print(f"     ... 还有 {len(result['tables']) - 5} 个台球桌")
+                
+                results[test_case['name']] = {
+                    'count': result['count'],
+                    'algorithm': result.get('algorithm', 'unknown'),
+                    'utilization': result['stats']['space_utilization']
+                }
             else:
-                print(f"❌ HTTP错误: {response.status_code}")
+                print(f"❌ 失败: {result.get('error', '未知错误')}")
                 
-        except requests.exceptions.ConnectionError:
-            print("❌ 无法连接到服务器，请确保服务器正在运行")
-            return
         except Exception as e:
             print(f"❌ 错误: {str(e)}")
     
@@ -129,8 +131,8 @@ def test_enhanced_api():
         print("算法对比结果:")
         print("=" * 60)
         
-        enhanced_result = next((r for r in results if '增强' in r['name']), None)
-        traditional_result = next((r for r in results if '传统' in r['name']), None)
+        enhanced_result = results.get('增强算法测试')
+        traditional_result = results.get('传统算法对比')
         
         if enhanced_result and traditional_result:
             improvement = enhanced_result['count'] - traditional_result['count']
@@ -149,9 +151,9 @@ def test_health_check():
     """测试健康检查"""
     print(f"\n健康检查:")
     try:
-        response = requests.get('http://127.0.0.1:8080/api/health')
+        response = get_session().get('http://127.0.0.1:8080/api/health')
         if response.status_code == 200:
-            result = response.json()
+            result = loads(response.content)
             print(f"✅ 服务器状态: {result['status']}")
             print(f"   版本: {result['version']}")
             print(f"   功能: {', '.join(result['features'])}")
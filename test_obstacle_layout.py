@@ -23,10 +23,16 @@ obstacles = [
     Rectangle(5000, 6500, 400, 400)   # 下方障碍物
 ]
 
-# 生成布局
-generator = OptimizedLayoutGenerator(config)
-layout = generator.generate_layout(boundary, obstacles)
+def main():
+    """生成布局并输出台球桌位置"""
+    # 生成布局
+    generator = OptimizedLayoutGenerator(config)
+    layout = generator.generate_layout(boundary, obstacles)
 
-print(f"\n生成了 {len(layout)} 个台球桌")
-for i, table in enumerate(layout):
-    print(f"台球桌 {i+1}: ({table.x}, {table.y}) - {'横向' if table.rotation == 0 else '纵向'}")
\ No newline at end of file
+    print(f"\n生成了 {len(layout)} 个台球桌")
+    for i, table in enumerate(layout):
+        print(f"台球桌 {i+1}: ({table.x}, {table.y}) - {'横向' if table.rotation == 0 else '纵向'}")
+
+
+if __name__ == "__main__":
+    main()
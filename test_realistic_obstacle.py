@@ -2,6 +2,10 @@
 基于实际截图的障碍物布局测试
 """
 
+from collections import Counter
+
+import numpy as np
+
 from core.optimized_layout import OptimizedLayoutGenerator
 from core.maxrects import Rectangle
 
@@ -22,28 +26,35 @@ obstacles = [
     Rectangle(7800, 8000, 400, 400)   # 下方中间
 ]
 
-print("测试更真实的障碍物布局")
-print("场地: 16m × 12m")
-print(f"障碍物: {len(obstacles)} 个")
+def main():
+    """生成布局并按方向和区域统计台球桌"""
+    print("测试更真实的障碍物布局")
+    print("场地: 16m × 12m")
+    print(f"障碍物: {len(obstacles)} 个")
+
+    # 生成布局
+    generator = OptimizedLayoutGenerator(config)
+    layout = generator.generate_layout(boundary, obstacles)
+
+    print(f"\n最终生成了 {len(layout)} 个台球桌")
 
-# 生成布局
-generator = OptimizedLayoutGenerator(config)
-layout = generator.generate_layout(boundary, obstacles)
+    # 分析布局分布
+    rotations = Counter(t.rotation for t in layout)
+    horizontal, vertical = rotations[0], rotations[90]
+    print(f"横向: {horizontal} 个")
+    print(f"纵向: {vertical} 个")
 
-print(f"\n最终生成了 {len(layout)} 个台球桌")
+    # 按区域分析（台球桌包围盒数组，列为 min_x, min_y, max_x, max_y）
+    # y < 3000、3000 <= y < 8000、y >= 8000 分别为上方、中间、下方区域，一次划分并计数
+    bounds = Rectangle.stack([t.get_bounds() for t in layout])
+    region = np.searchsorted([3000, 8000], bounds[:, 1], side='right')
+    top_count, middle_count, bottom_count = np.bincount(region, minlength=3)
 
-# 分析布局分布
-horizontal = sum(1 for t in layout if t.rotation == 0)
-vertical = sum(1 for t in layout if t.rotation == 90)
-print(f"横向: {horizontal} 个")
-print(f"纵向: {vertical} 个")
+    print(f"\n区域分布:")
+    print(f"上方区域: {top_count} 个")
+    print(f"中间区域: {middle_count} 个")
+    print(f"下方区域: {bottom_count} 个")
 
-# 按区域分析
-top_area = [t for t in layout if t.y < 3000]
-middle_area = [t for t in layout if 3000 <= t.y < 8000]
-bottom_area = [t for t in layout if t.y >= 8000]
 
-print(f"\n区域分布:")
-print(f"上方区域: {len(top_area)} 个")
-print(f"中间区域: {len(middle_area)} 个")
-print(f"下方区域: {len(bottom_area)} 个")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 """
 
 from core.maxrects import Rectangle
+from core.constraints import field_polygon
 from core.optimized_layout import OptimizedLayoutGenerator
 
 # 测试不同的约束配置
@@ -50,35 +51,43 @@ obstacles = [
     Rectangle(7000, 9000, 1500, 1500)
 ]
 
-print("测试不同约束条件下的布局效果")
-print("=" * 60)
-
-for config in test_configs:
-    print(f"\n{config['name']}:")
-    print(f"  墙壁距离: {config['wall_distance']}mm")
-    print(f"  台球桌间距: {config['table_distance']}mm")
-    
-    generator = OptimizedLayoutGenerator(config)
-    
-    # 只运行贪心算法以加快测试
-    best_layout = []
-    
-    # 贪心算法
-    layout = generator._try_greedy_layout(boundary, obstacles, {
+def main():
+    """依次测试各组约束配置"""
+    # 场地和障碍物不随约束变化，验证上下文只创建一次
+    context = {
         'boundary': boundary,
-        'boundary_polygon': None,
+        'boundary_polygon': field_polygon(boundary),
         'obstacles': obstacles
-    })
-    
-    print(f"  结果: {len(layout)} 个台球桌")
-    
-    if len(layout) >= 9:
-        print("  ✓ 达到或超过用户截图中的9个台球桌!")
-        break
+    }
+    generator = OptimizedLayoutGenerator(test_configs[0])
+
+    print("测试不同约束条件下的布局效果")
+    print("=" * 60)
+
+    for config in test_configs:
+        print(f"\n{config['name']}:")
+        print(f"  墙壁距离: {config['wall_distance']}mm")
+        print(f"  台球桌间距: {config['table_distance']}mm")
+        
+        generator.update_config(config)
+        
+        # 只运行单一方向网格布局以加快测试，取横向和纵向中较多的一个
+        layout = max((generator._try_single_orientation_layout(boundary, obstacles, context, rotation)
+                      for rotation in (0, 90)), key=len)
+        
+        print(f"  结果: {len(layout)} 个台球桌")
+        
+        if len(layout) >= 9:
+            print("  ✓ 达到或超过用户截图中的9个台球桌!")
+            break
+
+    print("\n结论:")
+    print("用户截图中的布局可能使用了更宽松的间距约束")
+    print("建议：")
+    print("1. 与用户确认实际的间距要求")
+    print("2. 在界面上提供间距参数的调整选项")
+    print("3. 显示当前使用的约束参数")
+
 
-print("\n结论:")
-print("用户截图中的布局可能使用了更宽松的间距约束")
-print("建议：")
-print("1. 与用户确认实际的间距要求")
-print("2. 在界面上提供间距参数的调整选项")
-print("3. 显示当前使用的约束参数")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
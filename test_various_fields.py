@@ -5,6 +5,9 @@
 
 import sys
 import os
+import io
+import contextlib
+import multiprocessing
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from core import LayoutOptimizer, Rectangle
@@ -17,8 +20,7 @@ def test_field(name, width, height, obstacles=[]):
         'table_width': 2850,
         'table_height': 1550,
         'grid_size': 100,
-        'use_regular_layout': True,
-        'optimize_count': True
+        'use_regular_layout': True
     }
     
     boundary = [
@@ -31,13 +33,12 @@ def test_field(name, width, height, obstacles=[]):
     optimizer = LayoutOptimizer(config)
     
     # 测试普通布局
-    config['optimize_count'] = False
-    result_regular = optimizer.optimize(boundary, obstacles, use_regular_layout=True)
+    result_regular = optimizer.optimize(boundary, obstacles, use_regular_layout=True,
+                                        optimize_count=False)
     
     # 测试优化布局
-    config['optimize_count'] = True
-    optimizer.config = config
-    result_optimized = optimizer.optimize(boundary, obstacles, use_regular_layout=True)
+    result_optimized = optimizer.optimize(boundary, obstacles, use_regular_layout=True,
+                                          optimize_count=True)
     
     print(f"\n{name} ({width/1000:.0f}m x {height/1000:.0f}m):")
     print(f"  普通布局: {result_regular['count']}个台球桌")
@@ -46,47 +47,54 @@ def test_field(name, width, height, obstacles=[]):
     
     return result_optimized['count'] - result_regular['count']
 
-def main():
-    print("=== 测试不同场地尺寸的布局优化效果 ===")
-    
-    improvements = []
-    
+# 各测试场地：(名称, 宽度, 高度, 障碍物)
+scenarios = [
     # 测试1: 小场地 (8x12m)
-    improvements.append(test_field("小场地", 8000, 12000))
-    
+    ("小场地", 8000, 12000, []),
     # 测试2: 中等场地 (10x15m) 无障碍物
-    improvements.append(test_field("中等场地(无障碍)", 10000, 15000))
-    
+    ("中等场地(无障碍)", 10000, 15000, []),
     # 测试3: 中等场地 (10x15m) 有障碍物
-    obstacles = [
+    ("中等场地(有障碍)", 10000, 15000, [
         Rectangle(2800, 4800, 400, 400),
         Rectangle(6800, 9800, 400, 400)
-    ]
-    improvements.append(test_field("中等场地(有障碍)", 10000, 15000, obstacles))
-    
+    ]),
     # 测试4: 大场地 (15x20m)
-    improvements.append(test_field("大场地", 15000, 20000))
-    
+    ("大场地", 15000, 20000, []),
     # 测试5: 大场地 (15x20m) 多障碍物
-    obstacles = [
+    ("大场地(多障碍)", 15000, 20000, [
         Rectangle(3000, 3000, 500, 500),
         Rectangle(7500, 5000, 400, 400),
         Rectangle(12000, 8000, 600, 600),
         Rectangle(5000, 15000, 500, 500)
-    ]
-    improvements.append(test_field("大场地(多障碍)", 15000, 20000, obstacles))
-    
+    ]),
     # 测试6: 长条形场地 (6x20m)
-    improvements.append(test_field("长条形场地", 6000, 20000))
-    
+    ("长条形场地", 6000, 20000, []),
     # 测试7: 方形场地 (12x12m)
-    improvements.append(test_field("方形场地", 12000, 12000))
-    
+    ("方形场地", 12000, 12000, []),
     # 测试8: L形场地（模拟）- 用矩形+障碍物模拟
-    obstacles = [
+    ("L形场地", 15000, 15000, [
         Rectangle(8000, 0, 7000, 8000)  # 遮挡右上角
-    ]
-    improvements.append(test_field("L形场地", 15000, 15000, obstacles))
+    ]),
+]
+
+def run_field(scenario):
+    """在子进程中运行单个场地测试，返回 (输出日志, 提升数量)"""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        improvement = test_field(*scenario)
+    return buffer.getvalue(), improvement
+
+def main():
+    print("=== 测试不同场地尺寸的布局优化效果 ===")
+    
+    # 各场地相互独立，并行运行；每个场地的输出先缓存，再按顺序打印
+    with multiprocessing.Pool(min(len(scenarios), os.cpu_count() or 1)) as pool:
+        outputs = pool.map(run_field, scenarios)
+    
+    improvements = []
+    for log, improvement in outputs:
+        print(log, end="")
+        improvements.append(improvement)
     
     print("\n=== 总结 ===")
     avg_improvement = sum(improvements) / len(improvements)
@@ -95,4 +103,4 @@ def main():
     print(f"最小提升: {min(improvements)}个台球桌")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()